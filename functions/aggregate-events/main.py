@@ -0,0 +1,430 @@
+"""
+CrowdStrike Foundry Function for aggregating security events stored in Collections.
+
+This module provides a REST API endpoint that answers group-by, count and top-N
+queries from a columnar in-memory index of a Collection. The index is kept warm
+across function invocations and refreshed incrementally from uploaded_at, the
+time each object was written.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from logging import Logger
+from typing import Dict, Any, Iterator, List, Tuple
+
+import numpy as np
+from crowdstrike.foundry.function import Function, Request, Response, APIError
+from falconpy import APIHarnessV2
+
+FUNC = Function.instance()
+
+INDEXED_FIELDS = ["event_type", "severity", "user", "source_ip"]
+TIME_BUCKET = "time_bucket"
+REFRESH_INTERVAL_SECONDS = 60
+# Re-fetch objects written shortly before the previous refresh started, covering
+# clock skew between writers and objects not yet searchable when it ran
+REFRESH_OVERLAP_SECONDS = 120
+# Rebuild from the whole collection periodically to drop deleted objects and pick
+# up objects from writers that do not stamp uploaded_at
+FULL_RELOAD_SECONDS = 3600
+MAX_BINCOUNT_GROUPS = 1 << 22
+
+# Indexes stay in memory between invocations of a warm function instance.
+# _INDEX_LOCK guards reads and writes of the indexes; refreshes fetch from the
+# API under a per-collection refresh lock so queries are not blocked meanwhile.
+_INDEXES: Dict[str, "EventIndex"] = {}
+_INDEX_LOCK = threading.Lock()
+_REFRESH_LOCKS: Dict[str, threading.Lock] = {}
+
+
+@FUNC.handler(method="POST", path="/aggregate-events")
+def aggregate_events_handler(request: Request, config: Dict[str, object] | None, logger: Logger) -> Response:
+    """Answer an aggregation query from the in-memory index of a Collection."""
+    # Mark unused config parameter
+    _ = config
+
+    collection_name = request.body.get("collection_name", "security_events_csv")
+
+    try:
+        query = _parse_query(request.body)
+
+        refreshed_events = _refresh_if_due(collection_name, bool(request.body.get("refresh")))
+        if refreshed_events:
+            logger.info(f"Loaded {refreshed_events} events into {collection_name} index")
+
+        with _INDEX_LOCK:
+            index = _INDEXES[collection_name]
+            start = time.perf_counter()
+            result = index.query(query)
+            query_ms = (time.perf_counter() - start) * 1000
+            indexed_events = index.size
+
+        return Response(
+            body={
+                **result,
+                "collection_name": collection_name,
+                "indexed_events": indexed_events,
+                "refreshed_events": refreshed_events,
+                "query_ms": round(query_ms, 3)
+            },
+            code=200
+        )
+
+    except ValueError as ve:
+        return Response(
+            code=400,
+            errors=[APIError(code=400, message=f"Validation error: {str(ve)}")]
+        )
+    except (ConnectionError, TimeoutError) as conn_error:
+        return Response(
+            code=503,
+            errors=[APIError(code=503, message=f"Connection error: {str(conn_error)}")]
+        )
+
+
+def _get_headers() -> Dict[str, str]:
+    """Get headers for API requests."""
+    headers = {}
+    if os.environ.get("APP_ID"):
+        headers = {"X-CS-APP-ID": os.environ.get("APP_ID")}
+    return headers
+
+
+def _refresh_if_due(collection_name: str, force: bool) -> int:
+    """Refresh the index of a collection when it is stale or force is set.
+
+    While another request is refreshing, a warm index is queried as it is instead
+    of waiting for the refresh to finish.
+
+    Returns:
+        The number of events fetched.
+    """
+    with _INDEX_LOCK:
+        index = _INDEXES.setdefault(collection_name, EventIndex())
+        refresh_lock = _REFRESH_LOCKS.setdefault(collection_name, threading.Lock())
+
+    if not force and time.time() - index.last_refresh < REFRESH_INTERVAL_SECONDS:
+        return 0
+    if not refresh_lock.acquire(blocking=force or index.last_refresh == 0):  # pylint: disable=consider-using-with
+        return 0
+
+    try:
+        # Another request may have refreshed the index while this one waited
+        with _INDEX_LOCK:
+            index = _INDEXES[collection_name]
+        if not force and time.time() - index.last_refresh < REFRESH_INTERVAL_SECONDS:
+            return 0
+
+        refresh_results = refresh_index(APIHarnessV2(), index, collection_name, _get_headers())
+        with _INDEX_LOCK:
+            _INDEXES[collection_name] = refresh_results["index"]
+        return refresh_results["loaded"]
+    finally:
+        refresh_lock.release()
+
+
+def _parse_query(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate the query fields of the request body."""
+    group_by = body.get("group_by", [])
+    if isinstance(group_by, str):
+        group_by = [group_by]
+    for field in group_by:
+        if field not in INDEXED_FIELDS and field != TIME_BUCKET:
+            raise ValueError(f"Invalid group_by field: {field}. Must be one of {INDEXED_FIELDS + [TIME_BUCKET]}")
+
+    filters = body.get("filters", {})
+    if not isinstance(filters, dict):
+        raise ValueError("filters must be an object")
+    for field, wanted in filters.items():
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Invalid filter field: {field}. Must be one of {INDEXED_FIELDS}")
+        if not all(isinstance(value, str) for value in (wanted if isinstance(wanted, list) else [wanted])):
+            raise ValueError(f"Filter values for {field} must be a string or a list of strings")
+
+    for field in ["start_time", "end_time"]:
+        value = body.get(field)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+            raise ValueError(f"{field} must be an integer Unix timestamp")
+
+    bucket_seconds = body.get("bucket_seconds", 3600)
+    if not isinstance(bucket_seconds, int) or bucket_seconds < 1:
+        raise ValueError("bucket_seconds must be a positive integer")
+
+    top_n = body.get("top_n")
+    if top_n is not None and (not isinstance(top_n, int) or top_n < 1):
+        raise ValueError("top_n must be a positive integer")
+
+    return {
+        "group_by": group_by,
+        "filters": filters,
+        "start_time": body.get("start_time"),
+        "end_time": body.get("end_time"),
+        "bucket_seconds": bucket_seconds,
+        "top_n": top_n
+    }
+
+
+class EventIndex:
+    """Columnar in-memory index of events keyed by object key.
+
+    String fields are dictionary-encoded into integer code arrays so filters and
+    group-bys run as vectorized numpy operations. Re-loading an object key updates
+    its row in place.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.watermark = 0
+        self.last_refresh = 0.0
+        self.last_full_load = 0.0
+        self._positions = {}
+        self._values = {field: [] for field in INDEXED_FIELDS}
+        self._codes = {field: {} for field in INDEXED_FIELDS}
+        self._columns = {field: np.zeros(capacity, dtype=np.int32) for field in INDEXED_FIELDS}
+        self._columns["timestamp_unix"] = np.zeros(capacity, dtype=np.int64)
+
+    def upsert(self, object_key: str, record: Dict[str, Any]) -> None:
+        """Add or replace the row for an object."""
+        position = self._positions.get(object_key)
+        if position is None:
+            if self.size == len(self._columns["timestamp_unix"]):
+                self._grow()
+            position = self.size
+            self._positions[object_key] = position
+            self.size += 1
+
+        for field in INDEXED_FIELDS:
+            self._columns[field][position] = self._encode(field, record.get(field))
+        self._columns["timestamp_unix"][position] = record.get("timestamp_unix") or 0
+
+    def query(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        """Count matching events, optionally grouped and limited to the top N groups."""
+        mask = np.ones(self.size, dtype=bool)
+
+        for field, wanted in query["filters"].items():
+            wanted = wanted if isinstance(wanted, list) else [wanted]
+            codes = [self._codes[field][value] for value in wanted if value in self._codes[field]]
+            if len(codes) == 1:
+                mask &= self._columns[field][:self.size] == codes[0]
+            else:
+                mask &= np.isin(self._columns[field][:self.size], codes)
+
+        timestamps = self._columns["timestamp_unix"][:self.size]
+        if query["start_time"] is not None:
+            mask &= timestamps >= query["start_time"]
+        if query["end_time"] is not None:
+            mask &= timestamps < query["end_time"]
+
+        total = int(np.count_nonzero(mask))
+        if not query["group_by"] or total == 0:
+            return {"total": total, "groups": []}
+
+        group_keys, counts = self._group_counts(mask, query["group_by"], query["bucket_seconds"])
+
+        # Order by count descending, breaking ties by group key
+        order = np.lexsort((np.arange(len(counts)), -counts))
+        if query["top_n"]:
+            order = order[:query["top_n"]]
+
+        groups = []
+        for i in order:
+            group = {field: self._decode(field, keys[i], query["bucket_seconds"])
+                     for field, keys in zip(query["group_by"], group_keys)}
+            group["count"] = int(counts[i])
+            groups.append(group)
+
+        return {"total": total, "groups": groups}
+
+    def _group_counts(self, mask: np.ndarray, group_by: List[str], bucket_seconds: int) -> tuple:
+        """Count rows per distinct combination of group_by values."""
+        offsets = []
+        radixes = []
+        columns = []
+        for field in group_by:
+            if field == TIME_BUCKET:
+                values = self._columns["timestamp_unix"][:self.size][mask] // bucket_seconds
+            else:
+                values = self._columns[field][:self.size][mask].astype(np.int64)
+            offset = int(values.min())
+            offsets.append(offset)
+            radixes.append(int(values.max()) - offset + 1)
+            columns.append(values - offset)
+
+        if math.prod(radixes) > np.iinfo(np.int64).max:
+            # Too many combinations to pack into one int64, so group the rows directly
+            unique_rows, counts = np.unique(np.stack(columns, axis=1), axis=0, return_counts=True)
+            return [unique_rows[:, i] + offset for i, offset in enumerate(offsets)], counts
+
+        # Pack each row's group values into a single mixed-radix integer
+        composite = np.zeros(len(columns[0]), dtype=np.int64)
+        for values, radix in zip(columns, radixes):
+            composite = composite * radix + values
+
+        if math.prod(radixes) <= MAX_BINCOUNT_GROUPS:
+            bins = np.bincount(composite)
+            unique = np.nonzero(bins)[0]
+            counts = bins[unique]
+        else:
+            unique, counts = np.unique(composite, return_counts=True)
+
+        # Unpack the composite keys back into per-field values
+        group_keys = []
+        for offset, radix in zip(reversed(offsets), reversed(radixes)):
+            group_keys.append(unique % radix + offset)
+            unique = unique // radix
+        group_keys.reverse()
+
+        return group_keys, counts
+
+    def _encode(self, field: str, value: Any) -> int:
+        value = "" if value is None else str(value)
+        code = self._codes[field].get(value)
+        if code is None:
+            code = len(self._values[field])
+            self._codes[field][value] = code
+            self._values[field].append(value)
+        return code
+
+    def _decode(self, field: str, key: int, bucket_seconds: int) -> Any:
+        if field == TIME_BUCKET:
+            return int(key) * bucket_seconds
+        return self._values[field][int(key)] or None
+
+    def _grow(self) -> None:
+        for field, column in self._columns.items():
+            self._columns[field] = np.concatenate([column, np.zeros(len(column), dtype=column.dtype)])
+
+
+def refresh_index(
+    api_client: APIHarnessV2,
+    index: EventIndex,
+    collection_name: str,
+    headers: Dict[str, str],
+    page_size: int = 500
+) -> Dict[str, Any]:
+    """
+    Bring an index up to date with its collection.
+
+    On the first load and every FULL_RELOAD_SECONDS a new index is built from every
+    key in the collection. Otherwise objects whose uploaded_at is at or after the
+    start of the previous refresh, less REFRESH_OVERLAP_SECONDS, are fetched and
+    upserted. Objects are fetched without holding _INDEX_LOCK.
+
+    Returns:
+        Dict with the index to use from now on and the number of events fetched.
+    """
+    refresh_started = int(time.time())
+
+    if not index.last_full_load or refresh_started - index.last_full_load >= FULL_RELOAD_SECONDS:
+        # Queries keep using the old index until the new one is complete
+        new_index = EventIndex()
+        loaded = 0
+        object_keys = _list_object_keys(api_client, collection_name, headers, page_size)
+        for object_key, record in _fetch_objects(api_client, collection_name, headers, object_keys):
+            new_index.upsert(object_key, record)
+            loaded += 1
+        new_index.watermark = refresh_started
+        new_index.last_full_load = refresh_started
+        new_index.last_refresh = time.time()
+        return {"index": new_index, "loaded": loaded}
+
+    since = index.watermark - REFRESH_OVERLAP_SECONDS
+    object_keys = _search_object_keys(api_client, collection_name, headers, f"uploaded_at:>={since}", page_size)
+    objects = list(_fetch_objects(api_client, collection_name, headers, object_keys))
+
+    with _INDEX_LOCK:
+        for object_key, record in objects:
+            index.upsert(object_key, record)
+        index.watermark = refresh_started
+        index.last_refresh = time.time()
+
+    return {"index": index, "loaded": len(objects)}
+
+
+def _list_object_keys(
+    api_client: APIHarnessV2,
+    collection_name: str,
+    headers: Dict[str, str],
+    page_size: int
+) -> Iterator[str]:
+    """Yield every object key in the collection, paging by start key."""
+    start_options = {}
+    last_key = None
+
+    while True:
+        list_response = api_client.command("ListObjects",
+                                           collection_name=collection_name,
+                                           limit=page_size,
+                                           headers=headers,
+                                           **start_options)
+        if list_response["status_code"] != 200:
+            raise ConnectionError(f"ListObjects failed with status {list_response['status_code']}: "
+                                  f"{list_response.get('body', {}).get('errors', [])}")
+
+        keys = list_response["body"].get("resources", [])
+
+        # Keys are listed in alphabetical order; skip the start key if the page repeats it
+        for object_key in keys:
+            if last_key is None or object_key > last_key:
+                last_key = object_key
+                yield object_key
+
+        if len(keys) < page_size:
+            return
+        start_options = {"start": last_key}
+
+
+def _search_object_keys(
+    api_client: APIHarnessV2,
+    collection_name: str,
+    headers: Dict[str, str],
+    search_filter: str,
+    page_size: int
+) -> Iterator[str]:
+    """Yield the key of every object matching the filter, oldest upload first."""
+    offset = 0
+
+    while True:
+        search_response = api_client.command("SearchObjects",
+                                             filter=search_filter,
+                                             collection_name=collection_name,
+                                             sort="uploaded_at.asc",
+                                             limit=page_size,
+                                             offset=offset,
+                                             headers=headers)
+        if search_response["status_code"] != 200:
+            raise ConnectionError(f"SearchObjects failed with status {search_response['status_code']}: "
+                                  f"{search_response.get('body', {}).get('errors', [])}")
+
+        # SearchObjects returns metadata, not actual objects
+        resources = search_response["body"].get("resources", [])
+        for resource in resources:
+            yield resource["object_key"]
+
+        if len(resources) < page_size:
+            return
+        offset += page_size
+
+
+def _fetch_objects(
+    api_client: APIHarnessV2,
+    collection_name: str,
+    headers: Dict[str, str],
+    object_keys: Iterator[str]
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield the key and content of each object with GetObject."""
+    for object_key in object_keys:
+        object_details = api_client.command("GetObject",
+                                            collection_name=collection_name,
+                                            object_key=object_key,
+                                            headers=headers)
+        if not isinstance(object_details, bytes):
+            raise ConnectionError(f"GetObject failed for {object_key}: {object_details.get('status_code')}")
+        yield object_key, json.loads(object_details.decode("utf-8"))
+
+
+if __name__ == "__main__":
+    FUNC.run()
@@ -0,0 +1,197 @@
+"""Tests for the aggregate-events function."""
+
+import importlib
+import json
+import logging
+import unittest
+from unittest.mock import MagicMock, patch
+
+from crowdstrike.foundry.function import Request
+
+import main
+
+
+def mock_handler(*_args, **_kwargs):
+    """Replace FUNC.handler so decorated handlers stay callable."""
+    def identity(func):
+        return func
+    return identity
+
+
+def _event(i, **fields):
+    """Build a stored security event."""
+    return {
+        "event_id": f"EVT-{i}",
+        "event_type": "login_failure",
+        "severity": ["low", "medium", "high", "critical"][i % 4],
+        "user": f"user{i % 3}",
+        "source_ip": f"10.0.0.{i % 5}",
+        "timestamp_unix": 1700000000 + i * 60,
+        "uploaded_at": 1000,
+        **fields
+    }
+
+
+class FakeStorage:
+    """Collection storage that answers ListObjects, SearchObjects and GetObject like the API."""
+
+    def __init__(self):
+        self.objects = {}
+        self.on_get = None
+        self.operations = []
+
+    def command(self, operation, **kwargs):
+        """Handle a FalconPy command."""
+        self.operations.append(operation)
+        if operation == "ListObjects":
+            # Keys are listed alphabetically from the start key, inclusive
+            keys = sorted(key for key in self.objects if key >= kwargs.get("start", ""))
+            return {"status_code": 200, "body": {"resources": keys[:kwargs["limit"]]}}
+        if operation == "SearchObjects":
+            # filter is a required parameter of SearchObjects
+            since = int(kwargs["filter"].split(">=")[1])
+            keys = [key for key, record in self.objects.items() if record["uploaded_at"] >= since]
+            page = keys[kwargs["offset"]:kwargs["offset"] + kwargs["limit"]]
+            return {"status_code": 200, "body": {"resources": [{"object_key": key} for key in page]}}
+        return self.get_object(kwargs["object_key"])
+
+    def get_object(self, object_key):
+        """Return a stored object as GetObject does."""
+        if self.on_get is not None:
+            self.on_get()
+        return json.dumps(self.objects[object_key]).encode("utf-8")
+
+
+class FnTestCase(unittest.TestCase):
+    """Base test case that reloads main with a pass-through handler decorator."""
+
+    def setUp(self):
+        patcher = patch("crowdstrike.foundry.function.Function.handler", new=mock_handler)
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        importlib.reload(main)
+        self.storage = FakeStorage()
+        api_patcher = patch.object(main, "APIHarnessV2", return_value=self.storage)
+        self.addCleanup(api_patcher.stop)
+        api_patcher.start()
+
+    def aggregate(self, body):
+        """Call the handler and return the response."""
+        return main.aggregate_events_handler(Request(body=body), None, logging.getLogger("test"))
+
+
+class QueryTestCase(FnTestCase):
+    """Tests for queries against the index."""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(40):
+            self.storage.objects[f"EVT-{i}"] = _event(i)
+
+    def test_group_by_with_filter_and_top_n(self):
+        """Groups are counted over filtered rows and ordered by count."""
+        response = self.aggregate({"filters": {"severity": ["high", "critical"]}, "group_by": "user", "top_n": 2})
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(response.body["total"], 20)
+        self.assertEqual(response.body["groups"], [{"user": "user0", "count": 7}, {"user": "user2", "count": 7}])
+
+    def test_invalid_time_range_is_rejected(self):
+        """Non-integer start_time and end_time return 400."""
+        for body in [{"start_time": "yesterday"}, {"end_time": 1.5}, {"start_time": True}]:
+            with self.subTest(body=body):
+                self.assertEqual(self.aggregate(body).code, 400)
+
+    def test_invalid_filter_values_are_rejected(self):
+        """Filter values that are not strings return 400 instead of failing the lookup."""
+        for filters in [{"user": {"name": "user0"}}, {"user": [["user0"]]}, {"severity": 3}, ["severity"]]:
+            with self.subTest(filters=filters):
+                self.assertEqual(self.aggregate({"filters": filters}).code, 400)
+
+    def test_group_keys_that_overflow_int64(self):
+        """Group-bys with more combinations than fit in an int64 are still counted exactly."""
+        index = main.EventIndex()
+        for i, timestamp in enumerate([0, 2 ** 62, 2 ** 62, 0, 2 ** 62]):
+            index.upsert(str(i), _event(i, timestamp_unix=timestamp, user=f"user{i % 2}"))
+        query = main._parse_query({"group_by": [main.TIME_BUCKET, "severity", "user"],  # pylint: disable=protected-access
+                                   "bucket_seconds": 1})
+
+        groups = index.query(query)["groups"]
+
+        self.assertEqual(sum(group["count"] for group in groups), 5)
+        self.assertIn({main.TIME_BUCKET: 2 ** 62, "severity": "medium", "user": "user1", "count": 1}, groups)
+        self.assertEqual(len(groups), 5)
+
+
+class RefreshTestCase(FnTestCase):
+    """Tests for keeping the index up to date."""
+
+    def refresh(self, index, now, page_size=500):
+        """Refresh an index as if the current time were now."""
+        with patch.object(main.time, "time", return_value=now):
+            return main.refresh_index(self.storage, index, "security_events_csv", {}, page_size)
+
+    def test_full_load_lists_every_key_across_pages(self):
+        """The full load pages through ListObjects by start key without repeating keys."""
+        self.storage.objects = {f"EVT-{i:03d}": _event(i) for i in range(23)}
+
+        results = self.refresh(main.EventIndex(), 1010, page_size=5)
+
+        self.assertEqual(results["loaded"], 23)
+        self.assertEqual(results["index"].size, 23)
+        self.assertNotIn("SearchObjects", self.storage.operations)
+
+    def test_incremental_refresh_picks_up_late_writes_from_earlier_imports(self):
+        """Rows written after a newer import was indexed are still loaded."""
+        self.storage.objects["A1"] = _event(1, uploaded_at=1000, imported_at=1000)
+        index = self.refresh(main.EventIndex(), 1010)["index"]
+
+        # Import B (started at 1005) was indexed; import A (started at 1000) then wrote A2
+        self.storage.objects["B1"] = _event(2, uploaded_at=1012, imported_at=1005)
+        index = self.refresh(index, 1020)["index"]
+        self.storage.objects["A2"] = _event(3, uploaded_at=1019, imported_at=1000)
+        index = self.refresh(index, 1080)["index"]
+
+        self.assertEqual(index.size, 3)
+
+    def test_full_reload_drops_deleted_objects(self):
+        """A periodic full reload rebuilds the index from the collection."""
+        self.storage.objects = {"A1": _event(1), "A2": _event(2)}
+        index = self.refresh(main.EventIndex(), 1010)["index"]
+        del self.storage.objects["A2"]
+
+        incremental = self.refresh(index, 1070)["index"]
+        self.assertIs(incremental, index)
+        self.assertEqual(incremental.size, 2)
+
+        reloaded = self.refresh(index, 1010 + main.FULL_RELOAD_SECONDS)["index"]
+        self.assertIsNot(reloaded, index)
+        self.assertEqual(reloaded.size, 1)
+
+    def test_refresh_fetches_without_holding_the_index_lock(self):
+        """Queries are not blocked while objects are fetched from the API."""
+        self.storage.objects = {"A1": _event(1)}
+        self.storage.on_get = lambda: self.assertFalse(main._INDEX_LOCK.locked())  # pylint: disable=protected-access
+        index = self.refresh(main.EventIndex(), 1010)["index"]
+
+        self.storage.objects["A2"] = _event(2, uploaded_at=1050)
+        self.refresh(index, 1070)
+
+        self.assertEqual(index.size, 2)
+
+    def test_storage_failures_return_503(self):
+        """Failed ListObjects or SearchObjects calls are reported as connection errors."""
+        self.storage.objects = {"A1": _event(1)}
+        self.assertEqual(self.aggregate({}).code, 200)
+        real_command = self.storage.command
+
+        for operation in ["SearchObjects", "ListObjects"]:
+            with self.subTest(operation=operation):
+                self.storage.command = MagicMock(side_effect=lambda name, failing=operation, **kwargs: (
+                    {"status_code": 500, "body": {"errors": ["boom"]}} if name == failing else real_command(name, **kwargs)))
+                with patch.object(main, "FULL_RELOAD_SECONDS", 0 if operation == "ListObjects" else 3600):
+                    self.assertEqual(self.aggregate({"refresh": True}).code, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Benchmark aggregate-events queries against the SearchObjects-based approach.
+
+Live mode counts malware_detected events by severity the way the Paginate
+workflow does (SearchObjects pages followed by GetObject per key), then loads
+the same collection into the aggregate-events index and times queries from it.
+It uses the same FALCON_CLIENT_ID, FALCON_CLIENT_SECRET and APP_ID environment
+variables as running a function locally.
+
+Emulator mode runs the same comparison against an in-memory emulator of the
+Custom Storage API filled with generated events, adding a simulated latency per
+API call, so it needs no Falcon credentials.
+
+Synthetic mode builds the index from generated events and times only the index
+queries.
+
+Usage:
+    python benchmark_aggregate_events.py [--collection security_events_csv]
+    python benchmark_aggregate_events.py --emulator 20000 [--latency-ms 20]
+    python benchmark_aggregate_events.py --synthetic 1000000
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+from generate_security_events import generate_event
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "aggregate-events"))
+
+import main as aggregate_events  # noqa: E402  pylint: disable=wrong-import-position,import-error
+
+from falconpy import APIHarnessV2  # noqa: E402  pylint: disable=wrong-import-position,wrong-import-order
+
+QUERIES = {
+    "malware by severity": {"filters": {"event_type": "malware_detected"}, "group_by": ["severity"]},
+    "critical count": {"filters": {"severity": "critical"}},
+    "top 10 users": {"group_by": ["user"], "top_n": 10},
+    "type x hour": {"group_by": ["event_type", "time_bucket"], "bucket_seconds": 3600},
+    "top 10 source_ip": {"group_by": ["source_ip"], "top_n": 10}
+}
+QUERY_RUNS = 50
+FILTER_CLAUSE = re.compile(r"(\w+):(>=|<)?('[^']*'|-?\d+)")
+
+
+class StorageEmulator:
+    """In-memory stand-in for the Custom Storage object API used by aggregate-events"""
+
+    def __init__(self, latency_ms):
+        self.latency = latency_ms / 1000
+        self.objects = {}
+        self.calls = 0
+        self.elapsed = 0.0
+        self._searches = {}
+
+    def put(self, collection_name, object_key, record):
+        """Store an object without counting an API call"""
+        self.objects.setdefault(collection_name, {})[object_key] = record
+        self._searches.clear()
+
+    def command(self, operation, **kwargs):
+        """Emulate ListObjects, SearchObjects and GetObject with simulated latency"""
+        self.calls += 1
+        self.elapsed += self.latency
+        collection = self.objects.setdefault(kwargs["collection_name"], {})
+
+        if operation == "ListObjects":
+            keys = sorted(key for key in collection if key >= kwargs.get("start", ""))
+            return {"status_code": 200, "body": {"resources": keys[:kwargs["limit"]]}}
+        if operation == "SearchObjects":
+            matches = self._search(kwargs["collection_name"], kwargs["filter"], kwargs.get("sort"))
+            page = matches[kwargs["offset"]:kwargs["offset"] + kwargs["limit"]]
+            return {"status_code": 200, "body": {"resources": [{"object_key": key} for key in page]}}
+        if operation == "GetObject":
+            return json.dumps(collection[kwargs["object_key"]]).encode("utf-8")
+        raise ValueError(f"Unsupported operation: {operation}")
+
+    def _search(self, collection_name, search_filter, sort):
+        cache_key = (collection_name, search_filter, sort)
+        if cache_key not in self._searches:
+            clauses = FILTER_CLAUSE.findall(search_filter)
+            matches = [key for key, record in self.objects[collection_name].items()
+                       if all(self._matches(record.get(field), op, value) for field, op, value in clauses)]
+            if sort:
+                field = sort.split(".")[0]
+                matches.sort(key=lambda key: (self.objects[collection_name][key].get(field, 0), key))
+            self._searches[cache_key] = matches
+        return self._searches[cache_key]
+
+    @staticmethod
+    def _matches(stored, op, value):
+        if value.startswith("'"):
+            return stored == value.strip("'")
+        if op == ">=":
+            return stored is not None and stored >= int(value)
+        if op == "<":
+            return stored is not None and stored < int(value)
+        return stored == int(value)
+
+
+def search_objects_count(api_client, collection_name, headers, page_size=100):
+    """Count malware_detected events by severity with SearchObjects and GetObject"""
+    counts = {}
+    offset = 0
+    while True:
+        response = api_client.command("SearchObjects",
+                                      filter="event_type:'malware_detected'",
+                                      collection_name=collection_name,
+                                      limit=page_size,
+                                      offset=offset,
+                                      headers=headers)
+        resources = response.get("body", {}).get("resources", [])
+        for resource in resources:
+            details = api_client.command("GetObject",
+                                         collection_name=collection_name,
+                                         object_key=resource["object_key"],
+                                         headers=headers)
+            severity = json.loads(details.decode("utf-8"))["severity"]
+            counts[severity] = counts.get(severity, 0) + 1
+        if len(resources) < page_size:
+            return counts
+        offset += page_size
+
+
+def generate_events(num_events):
+    """Generate security events with the fields csv-import stores"""
+    base_time = datetime(2024, 1, 1, 8, 0, 0)
+    uploaded_at = int(time.time()) - 3600
+    for i in range(num_events):
+        event = generate_event(i, base_time)
+        event["timestamp_unix"] = int(datetime.strptime(event["timestamp"], "%Y-%m-%dT%H:%M:%SZ")
+                                      .replace(tzinfo=timezone.utc).timestamp())
+        event["uploaded_at"] = uploaded_at
+        yield event
+
+
+def build_synthetic_index(num_events):
+    """Build an index from generated events without calling the API"""
+    index = aggregate_events.EventIndex()
+    for event in generate_events(num_events):
+        index.upsert(event["event_id"], event)
+    return index
+
+
+def compare_with_search_objects(api_client, collection_name, headers, storage=None):
+    """Time the SearchObjects count, the index loads and the same count from the warm index
+
+    With an emulator, its simulated API latency is added to each timing.
+    """
+    def timed(operation):
+        simulated = storage.elapsed if storage else 0.0
+        start = time.perf_counter()
+        result = operation()
+        simulated = storage.elapsed - simulated if storage else 0.0
+        return result, (time.perf_counter() - start + simulated) * 1000
+
+    counts, elapsed_ms = timed(lambda: search_objects_count(api_client, collection_name, headers))
+    print(f"SearchObjects + GetObject: {counts} in {elapsed_ms:.0f} ms")
+
+    refresh_results, elapsed_ms = timed(lambda: aggregate_events.refresh_index(
+        api_client, aggregate_events.EventIndex(), collection_name, headers))
+    print(f"Cold index load: {refresh_results['loaded']} events in {elapsed_ms:.0f} ms")
+
+    index = refresh_results["index"]
+    refresh_results, elapsed_ms = timed(lambda: aggregate_events.refresh_index(
+        api_client, index, collection_name, headers))
+    print(f"Incremental refresh: {refresh_results['loaded']} events in {elapsed_ms:.0f} ms")
+
+    query = aggregate_events._parse_query(QUERIES["malware by severity"])  # pylint: disable=protected-access
+    result, elapsed_ms = timed(lambda: refresh_results["index"].query(query))
+    index_counts = {group["severity"]: group["count"] for group in result["groups"]}
+    print(f"Warm index: {index_counts} in {elapsed_ms:.3f} ms"
+          f"{'' if index_counts == counts else ' (MISMATCH with SearchObjects)'}")
+
+    return refresh_results["index"]
+
+
+def time_queries(index):
+    """Print median and p95 latency for each benchmark query"""
+    print(f"\n{'query':<24}{'p50 ms':>10}{'p95 ms':>10}{'groups':>8}")
+    for name, body in QUERIES.items():
+        query = aggregate_events._parse_query(body)  # pylint: disable=protected-access
+        timings = []
+        for _ in range(QUERY_RUNS):
+            start = time.perf_counter()
+            result = index.query(query)
+            timings.append((time.perf_counter() - start) * 1000)
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(f"{name:<24}{statistics.median(timings):>10.3f}{p95:>10.3f}{len(result['groups']):>8}")
+
+
+def main():
+    """Run the benchmark in live, emulator or synthetic mode"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", default="security_events_csv")
+    parser.add_argument("--emulator", type=int, metavar="NUM_EVENTS",
+                        help="Compare against a local Custom Storage emulator holding generated events")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated latency per emulated API call")
+    parser.add_argument("--synthetic", type=int, metavar="NUM_EVENTS",
+                        help="Build the index from generated events and time only index queries")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        start = time.perf_counter()
+        index = build_synthetic_index(args.synthetic)
+        print(f"Indexed {index.size} synthetic events in {time.perf_counter() - start:.2f}s")
+        time_queries(index)
+        return
+
+    if args.emulator:
+        storage = StorageEmulator(args.latency_ms)
+        for event in generate_events(args.emulator):
+            storage.put(args.collection, event["event_id"], event)
+        print(f"{args.emulator} events in emulated {args.collection}, {args.latency_ms} ms per API call")
+        time_queries(compare_with_search_objects(storage, args.collection, {}, storage))
+        return
+
+    api_client = APIHarnessV2()
+    headers = aggregate_events._get_headers()  # pylint: disable=protected-access
+    time_queries(compare_with_search_objects(api_client, args.collection, headers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark event_id deduplication for the csv-import function.
+
+Generates a CSV file where 30% of the rows repeat an earlier event_id, then
+times each dedup policy with the exact seen-set, and the first policy with the
+Bloom-filter seen-set. The parsed file is deduplicated chunk by chunk as an
+import does, with uploads replaced by a no-op: first drops duplicates as each
+chunk arrives, while last and latest collect every chunk first. The PutObject
+calls saved equal the reported duplicate rows. No API calls are made.
+
+Usage:
+    python benchmark_dedup.py [num_events]
+"""
+
+import csv
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+from generate_security_events import generate_event
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "csv-import"))
+
+import main as csv_import  # noqa: E402  pylint: disable=wrong-import-position,import-error
+
+NUM_EVENTS = 100000
+DUPLICATE_RATE = 0.3
+OUTPUT_FILE = "security_events_dedup_benchmark.csv"
+
+
+def write_events(num_events):
+    """Write a CSV file where DUPLICATE_RATE of the rows reuse an earlier event_id"""
+    base_time = datetime(2024, 1, 1, 8, 0, 0)
+    with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as csvfile:
+        fieldnames = ["event_id", "timestamp", "event_type", "severity",
+                      "source_ip", "destination_ip", "user", "description"]
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        # Duplicates reuse IDs that were actually written, so exactly the
+        # duplicated rows repeat an earlier event_id
+        written_ids = []
+        for i in range(num_events):
+            event = generate_event(i, base_time)
+            if written_ids and random.random() < DUPLICATE_RATE:
+                event["event_id"] = random.choice(written_ids)
+            else:
+                written_ids.append(event["event_id"])
+            writer.writerow(event)
+
+
+def dedup_chunks(chunks, policy, seen_set):
+    """Run the import dedup stage over parsed chunks, counting the records it would upload"""
+    uploads = {"records": 0}
+
+    def count_upload(records):
+        uploads["records"] += len(records)
+
+    counts = csv_import._import_chunks({"source_filename": OUTPUT_FILE, "chunks": chunks},  # pylint: disable=protected-access
+                                       {"policy": policy, "seen_set": seen_set}, count_upload)
+    return counts["duplicate_rows"], uploads["records"]
+
+
+def main():
+    """Generate the benchmark file and report dedup throughput for each policy"""
+    num_events = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_EVENTS
+
+    print(f"Generating {num_events} security events ({DUPLICATE_RATE:.0%} duplicates) in {OUTPUT_FILE}...")
+    write_events(num_events)
+    chunks = list(csv_import._iter_csv_chunks(OUTPUT_FILE, OUTPUT_FILE, int(time.time())))  # pylint: disable=protected-access
+    total_records = sum(len(chunk["transformed_records"]) for chunk in chunks)
+
+    print(f"\n{'policy':<10}{'seen-set':<10}{'seconds':>10}{'rows/sec':>14}{'duplicates':>12}{'PUTs':>10}")
+    for policy in ["first", "last", "latest"]:
+        for seen_set in csv_import.SEEN_SET_MODES if policy == "first" else ["exact"]:
+            start = time.perf_counter()
+            duplicate_rows, puts = dedup_chunks(chunks, policy, seen_set)
+            elapsed = time.perf_counter() - start
+            print(f"{policy:<10}{seen_set:<10}{elapsed:>10.2f}{total_records / elapsed:>14,.0f}"
+                  f"{duplicate_rows:>12,}{puts:>10,}")
+
+    print(f"\nWithout deduplication: {total_records:,} PUTs")
+    os.remove(OUTPUT_FILE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark log-event storage layouts: one object per event vs time-bucketed parts.
+
+Runs against a local in-memory emulator of the Custom Storage object API that
+adds a fixed round-trip latency to every call. Writes events at a steady rate
+over a simulated time range, then reads back ranges of different widths, and
+reports throughput, API calls and objects stored for both layouts.
+
+Usage:
+    python benchmark_event_layouts.py [--events 20000] [--minutes 60] [--latency-ms 20] [--batch 1]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "log-event"))
+
+import main as log_event  # noqa: E402  pylint: disable=wrong-import-position,import-error
+
+RANGE_MINUTES = [1, 10, 60]
+FILTER_CLAUSE = re.compile(r"(\w+):(>=|<)(-?\d+)")
+
+
+class StorageEmulator:
+    """In-memory stand-in for the Custom Storage object API used by log-event"""
+
+    def __init__(self, latency_ms):
+        self.latency = latency_ms / 1000
+        self.objects = {}
+        self.calls = 0
+        self.elapsed = 0.0
+
+    def reset_counters(self):
+        """Reset the call count and simulated latency"""
+        self.calls = 0
+        self.elapsed = 0.0
+
+    def command(self, operation, **kwargs):
+        """Emulate PutObject, GetObject and SearchObjects with simulated latency"""
+        self.calls += 1
+        self.elapsed += self.latency
+        collection = self.objects.setdefault(kwargs["collection_name"], {})
+
+        if operation == "PutObject":
+            collection[kwargs["object_key"]] = json.dumps(kwargs["body"])
+            return {"status_code": 200, "body": {}}
+        if operation == "GetObject":
+            return collection[kwargs["object_key"]].encode("utf-8")
+        if operation == "SearchObjects":
+            clauses = FILTER_CLAUSE.findall(kwargs["filter"])
+            matches = []
+            for key, raw in collection.items():
+                stored = json.loads(raw)
+                if all(stored[field] >= int(value) if op == ">=" else stored[field] < int(value)
+                       for field, op, value in clauses):
+                    matches.append(key)
+            page = sorted(matches)[kwargs.get("offset", 0):kwargs.get("offset", 0) + kwargs["limit"]]
+            return {"status_code": 200, "body": {"resources": [{"object_key": key} for key in page]}}
+        raise ValueError(f"Unsupported operation: {operation}")
+
+
+def write_events(layout, storage, args, start_time):
+    """Write args.events events spread evenly over args.minutes"""
+    log_event._OPEN_PARTS.clear()  # pylint: disable=protected-access
+    interval = args.minutes * 60 / args.events
+    for i in range(0, args.events, args.batch):
+        timestamp = start_time + int(i * interval)
+        events = [{"event_id": str(uuid.uuid4()), "data": {"sequence": i + j}, "timestamp": timestamp}
+                  for j in range(min(args.batch, args.events - i))]
+        if layout == "bucketed":
+            log_event.append_to_bucket(storage, events, {})
+        else:
+            for event in events:
+                storage.command("PutObject", body=event, collection_name=log_event.EVENT_COLLECTION,
+                                object_key=event["event_id"], headers={})
+
+
+def main():
+    """Run write and range-read benchmarks for both layouts"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--minutes", type=int, default=60)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--batch", type=int, default=1, help="Events per write request")
+    args = parser.parse_args()
+
+    start_time = 1704096000
+    print(f"{args.events} events over {args.minutes} minutes, {args.latency_ms} ms per API call, "
+          f"batch size {args.batch}")
+
+    for layout in log_event.LAYOUTS:
+        storage = StorageEmulator(args.latency_ms)
+        write_start = time.perf_counter()
+        write_events(layout, storage, args, start_time)
+        write_seconds = time.perf_counter() - write_start + storage.elapsed
+        stored = sum(len(objects) for objects in storage.objects.values())
+        print(f"\n[{layout}] write: {args.events / write_seconds:,.0f} events/sec, "
+              f"{storage.calls:,} API calls, {stored:,} objects")
+
+        for minutes in RANGE_MINUTES:
+            storage.reset_counters()
+            read_start = time.perf_counter()
+            results = log_event.read_events_range(storage, layout, start_time, start_time + minutes * 60, {})
+            read_seconds = time.perf_counter() - read_start + storage.elapsed
+            print(f"[{layout}] read {minutes:>3} min: {len(results['events']):>7,} events in {read_seconds:8.2f}s "
+                  f"({storage.calls:,} API calls, {results['objects_read']:,} objects)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark parallel CSV parsing for the csv-import function.
+
+Generates a CSV file of security events and measures rows/sec for the
+single-process pandas path and for parse_csv_file_parallel with 1, 4 and 16
+workers. No API calls are made; only the parse and transform stages are timed.
+
+Usage:
+    python benchmark_parallel_csv.py [num_events]
+"""
+
+import csv
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+from generate_security_events import generate_event
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "csv-import"))
+
+import main as csv_import  # noqa: E402  pylint: disable=wrong-import-position,import-error
+
+import pandas as pd  # noqa: E402  pylint: disable=wrong-import-position,wrong-import-order
+
+NUM_EVENTS = 200000
+OUTPUT_FILE = "security_events_benchmark.csv"
+WORKER_COUNTS = [1, 4, 16]
+
+
+def write_events(num_events):
+    """Write a CSV file with the requested number of security events"""
+    base_time = datetime(2024, 1, 1, 8, 0, 0)
+    with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as csvfile:
+        fieldnames = ["event_id", "timestamp", "event_type", "severity",
+                      "source_ip", "destination_ip", "user", "description"]
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for i in range(num_events):
+            writer.writerow(generate_event(i, base_time))
+
+
+def time_single_process(import_timestamp):
+    """Time the existing pd.read_csv + _process_dataframe path"""
+    start = time.perf_counter()
+    df = pd.read_csv(OUTPUT_FILE, **csv_import.CSV_READ_OPTIONS)
+    records = csv_import._process_dataframe(df, OUTPUT_FILE, import_timestamp)  # pylint: disable=protected-access
+    return time.perf_counter() - start, len(records)
+
+
+def time_parallel(workers, import_timestamp, logger):
+    """Time parse_csv_file_parallel with the given number of workers"""
+    start = time.perf_counter()
+    results = csv_import.parse_csv_file_parallel(os.path.abspath(OUTPUT_FILE), OUTPUT_FILE,
+                                                 import_timestamp, workers, logger)
+    return time.perf_counter() - start, len(results["transformed_records"])
+
+
+def main():
+    """Generate the benchmark file and report rows/sec for each mode"""
+    num_events = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_EVENTS
+    logger = logging.getLogger("benchmark")
+
+    print(f"Generating {num_events} security events in {OUTPUT_FILE}...")
+    write_events(num_events)
+    print(f"File size: {os.path.getsize(OUTPUT_FILE) / (1024 * 1024):.1f} MB (cpu_count={os.cpu_count()})")
+
+    import_timestamp = int(time.time())
+    print(f"\n{'mode':<20}{'seconds':>10}{'rows/sec':>14}")
+
+    elapsed, count = time_single_process(import_timestamp)
+    print(f"{'single-process':<20}{elapsed:>10.2f}{count / elapsed:>14,.0f}")
+
+    for workers in WORKER_COUNTS:
+        elapsed, count = time_parallel(workers, import_timestamp, logger)
+        print(f"{f'parallel x{workers}':<20}{elapsed:>10.2f}{count / elapsed:>14,.0f}")
+
+    os.remove(OUTPUT_FILE)
+
+
+if __name__ == "__main__":
+    main()
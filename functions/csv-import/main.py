@@ -2,16 +2,28 @@
 CrowdStrike Foundry Function for importing CSV data into Collections.
 
 This module provides a REST API endpoint for importing CSV data into CrowdStrike
-Foundry Collections with data transformation and validation.
+Foundry Collections with data transformation and validation. Imports can also run
+as background jobs whose progress is persisted in the processing_checkpoints
+Collection and reported by a status endpoint.
 """
+# pylint: disable=too-many-lines
 
+import hashlib
 import io
+import json
+import math
+import mmap
 import os
+import sqlite3
+import tempfile
+import threading
 import time
 import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from logging import Logger
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, Iterator, List, Tuple
 
 import pandas as pd
 from crowdstrike.foundry.function import Function, Request, Response, APIError
@@ -19,6 +31,18 @@ from falconpy import APIHarnessV2
 
 FUNC = Function.instance()
 
+CHECKPOINT_COLLECTION = "processing_checkpoints"
+CHECKPOINT_INTERVAL_SECONDS = 5
+# A running job whose checkpoint is older than this has stopped, for example
+# because the function instance running it was recycled
+STALE_JOB_SECONDS = 60
+
+# Read every column as text so the same row parses identically whether it is
+# read whole, in chunks or in a parallel shard
+CSV_READ_OPTIONS = {"dtype": str}
+CSV_CHUNK_ROWS = 10000
+MAX_SHARD_BYTES = 32 * 1024 * 1024
+
 
 @FUNC.handler(method="POST", path="/import-csv")
 def import_csv_handler(request: Request, config: Dict[str, object] | None, logger: Logger) -> Response:
@@ -27,10 +51,11 @@ def import_csv_handler(request: Request, config: Dict[str, object] | None, logge
     _ = config
 
     # Validate request
-    if "csv_data" not in request.body and "csv_file_path" not in request.body:
+    if ("csv_data" not in request.body and "csv_file_path" not in request.body
+            and not request.body.get("retry_failed")):
         return Response(
             code=400,
-            errors=[APIError(code=400, message="Either csv_data or csv_file_path is required")]
+            errors=[APIError(code=400, message="Either csv_data, csv_file_path or retry_failed is required")]
         )
 
     collection_name = request.body.get("collection_name", "security_events_csv")
@@ -61,32 +86,405 @@ def import_csv_handler(request: Request, config: Dict[str, object] | None, logge
         )
 
 
+@FUNC.handler(method="POST", path="/import-status")
+def import_status_handler(request: Request, config: Dict[str, object] | None, logger: Logger) -> Response:
+    """Report the progress of a background CSV import job."""
+    # Mark unused config parameter
+    _ = config
+
+    if "job_id" not in request.body:
+        return Response(
+            code=400,
+            errors=[APIError(code=400, message="job_id is required")]
+        )
+
+    job_id = request.body["job_id"]
+    logger.debug(f"Fetching status for import job {job_id}")
+
+    # GetObject returns bytes on success and an error dict otherwise
+    object_details = APIHarnessV2().command("GetObject",
+                                            collection_name=CHECKPOINT_COLLECTION,
+                                            object_key=ImportJob.object_key(job_id),
+                                            headers=_get_headers())
+    if not isinstance(object_details, bytes):
+        status_code = object_details.get("status_code", 404)
+        return Response(
+            code=status_code,
+            errors=[APIError(code=status_code, message=f"Import job not found: {job_id}")]
+        )
+
+    checkpoint = json.loads(object_details.decode("utf-8"))
+    if checkpoint.get("status") == "running" and time.time() - checkpoint.get("last_updated", 0) > STALE_JOB_SECONDS:
+        checkpoint = _fail_stale_job(checkpoint, logger)
+
+    return Response(body=checkpoint, code=200)
+
+
+def _fail_stale_job(checkpoint: Dict[str, Any], logger: Logger) -> Dict[str, Any]:
+    """Mark a running job that stopped sending heartbeats as failed."""
+    checkpoint = {
+        **checkpoint,
+        "status": "failed",
+        "error": f"No progress recorded for over {STALE_JOB_SECONDS} seconds; "
+                 f"the function instance running the import most likely stopped"
+    }
+    response = APIHarnessV2().command("PutObject",
+                                      body=checkpoint,
+                                      collection_name=CHECKPOINT_COLLECTION,
+                                      object_key=checkpoint["workflow_id"],
+                                      headers=_get_headers())
+    if response["status_code"] != 200:
+        logger.warning(f"Failed to record stale import job {checkpoint['job_id']}: {response['status_code']}")
+    return checkpoint
+
+
+def _start_import_job(request: Request, collection_name: str, logger: Logger) -> Response:
+    """Validate the request, start the import in a background thread and return its job id."""
+    # Surface request errors now rather than in the background job
+    _get_parallel_workers(request)
+    _validate_dedup_options(request.body.get("dedup_policy", "last"), request.body.get("dedup_seen_set", "exact"))
+    if request.body.get("retry_failed") and _get_dead_letter_sink(request) is None:
+        raise ValueError("retry_failed requires dead_letter_path or dead_letter_collection")
+    if "csv_data" not in request.body and "csv_file_path" in request.body:
+        csv_file_path = _resolve_csv_file_path(request.body["csv_file_path"], logger)
+        if not os.path.exists(csv_file_path):
+            raise FileNotFoundError(csv_file_path)
+
+    job = ImportJob(collection_name)
+    try:
+        job.save()
+    except ConnectionError as save_error:
+        return Response(
+            code=503,
+            errors=[APIError(code=503, message=f"Failed to create import job: {str(save_error)}")]
+        )
+
+    # Background threads only run while this function instance is alive; the
+    # heartbeat lets /import-status detect jobs that stopped with the instance
+    threading.Thread(target=job.heartbeat, daemon=True).start()
+    threading.Thread(target=_run_import_job, args=(job, request, logger), daemon=True).start()
+
+    return Response(
+        body={
+            "job_id": job.job_id,
+            "status": job.status,
+            "collection_name": collection_name
+        },
+        code=202
+    )
+
+
+def _run_import_job(job: "ImportJob", request: Request, logger: Logger) -> None:
+    """Run an import in the background, recording the outcome in the job checkpoint."""
+    try:
+        results = run_import(request, job.collection_name, logger, job)
+        job.complete(results)
+    # Nothing else reports errors from this thread, so any failure, such as a
+    # BrokenProcessPool from the parse workers, must be recorded on the job
+    except Exception as job_error:  # pylint: disable=broad-exception-caught
+        logger.error(f"Import job {job.job_id} failed: {str(job_error)}")
+        try:
+            job.fail(f"{type(job_error).__name__}: {str(job_error)}")
+        except ConnectionError as save_error:
+            # The heartbeat has stopped, so /import-status reports the job as failed once it goes stale
+            logger.error(f"Failed to record failure of import job {job.job_id}: {str(save_error)}")
+
+
+class ImportJob:
+    """Progress of a background import, persisted in the processing_checkpoints Collection."""
+
+    def __init__(self, collection_name: str):
+        self.job_id = str(uuid.uuid4())
+        self.collection_name = collection_name
+        self.status = "running"
+        self.stage = "parsing"
+        self.started_at = int(time.time())
+        self.source_file = None
+        self.error = None
+        self.counts = {"rows_parsed": 0, "rows_queued": 0, "rows_uploaded": 0, "rows_failed": 0}
+        self.results = {}
+        self._timing = {"upload_started": None, "last_saved": 0.0}
+        self._storage = {"api_client": APIHarnessV2(), "headers": _get_headers(), "lock": threading.Lock()}
+        self._finished = threading.Event()
+
+    @staticmethod
+    def object_key(job_id: str) -> str:
+        """Get the checkpoint object key for a job."""
+        return f"csv_import_{job_id}"
+
+    def parsing(self, source_file: str, rows_parsed: int) -> None:
+        """Record cumulative rows parsed so far."""
+        self.source_file = source_file
+        self.counts["rows_parsed"] = rows_parsed
+        self._save_periodically()
+
+    def uploading(self, rows_queued: int) -> None:
+        """Record cumulative rows handed to the upload stage."""
+        self.counts["rows_queued"] = rows_queued
+        if self._timing["upload_started"] is None:
+            self.stage = "uploading"
+            self._timing["upload_started"] = time.time()
+            self._save_tolerantly()
+
+    def uploaded(self, success_count: int, error_count: int) -> None:
+        """Record cumulative upload counts."""
+        self.counts["rows_uploaded"] = success_count
+        self.counts["rows_failed"] = error_count
+        self._save_periodically()
+
+    def complete(self, results: Dict[str, Any]) -> None:
+        """Record the final import results."""
+        self.status = "completed"
+        self.stage = "done"
+        self.results = {
+            "total_rows": results["total_rows"],
+            "processed_rows": results["processed_rows"],
+            "duplicate_rows": results["duplicate_rows"],
+            "dead_letter_rows": results["dead_letter_rows"]
+        }
+        self._finished.set()
+        self.save()
+
+    def fail(self, error: str) -> None:
+        """Record that the import stopped with an error."""
+        self.status = "failed"
+        self.error = error
+        self._finished.set()
+        self.save()
+
+    def heartbeat(self) -> None:
+        """Save the checkpoint at least every CHECKPOINT_INTERVAL_SECONDS until the job finishes."""
+        while not self._finished.wait(CHECKPOINT_INTERVAL_SECONDS):
+            self._save_periodically()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Build the checkpoint object for this job."""
+        now = time.time()
+        upload_started = self._timing["upload_started"]
+        records_per_second = 0.0
+        if upload_started is not None and now > upload_started:
+            uploaded = self.counts["rows_uploaded"] + self.counts["rows_failed"]
+            records_per_second = round(uploaded / (now - upload_started), 2)
+
+        return {
+            "workflow_id": self.object_key(self.job_id),
+            "job_id": self.job_id,
+            "status": self.status,
+            "stage": self.stage,
+            "collection_name": self.collection_name,
+            "source_file": self.source_file,
+            **self.counts,
+            **self.results,
+            "records_per_second": records_per_second,
+            "processed_count": self.counts["rows_uploaded"],
+            "started_at": self.started_at,
+            "last_processed_timestamp": int(now),
+            "last_updated": int(now),
+            "error": self.error
+        }
+
+    def _save_periodically(self) -> None:
+        """Save at most every CHECKPOINT_INTERVAL_SECONDS, tolerating failed saves."""
+        if time.time() - self._timing["last_saved"] >= CHECKPOINT_INTERVAL_SECONDS:
+            self._save_tolerantly()
+
+    def _save_tolerantly(self) -> None:
+        """Save a progress update, logging instead of raising if the save fails."""
+        try:
+            self.save()
+        except ConnectionError as save_error:
+            # A missed progress update is retried at the next interval
+            print(f"Failed to save checkpoint for import job {self.job_id}: {str(save_error)}")
+
+    def save(self) -> None:
+        """Persist the job checkpoint."""
+        with self._storage["lock"]:
+            self._timing["last_saved"] = time.time()
+            response = self._storage["api_client"].command("PutObject",
+                                                           body=self.to_dict(),
+                                                           collection_name=CHECKPOINT_COLLECTION,
+                                                           object_key=self.object_key(self.job_id),
+                                                           headers=self._storage["headers"])
+        if response["status_code"] != 200:
+            raise ConnectionError(f"Failed to save import job checkpoint: {response['status_code']}")
+
+
 def _process_import_request(request: Request, collection_name: str, logger: Logger) -> Response:
     """Process the import request and return response."""
+    if request.body.get("async"):
+        # Run the import in the background and report progress via /import-status
+        return _start_import_job(request, collection_name, logger)
+
+    return _create_success_response(run_import(request, collection_name, logger))
+
+
+def run_import(
+    request: Request,
+    collection_name: str,
+    logger: Logger,
+    job: ImportJob | None = None
+) -> Dict[str, Any]:
+    """Run the parse, transform, deduplicate and upload pipeline for a request.
+
+    Rows are parsed in chunks. With the none and first dedup policies each chunk
+    is uploaded as soon as it is parsed; last and latest collect every chunk so
+    they can be deduplicated as a whole. When job is given, its progress is
+    updated after each chunk and each batch.
+    """
     # Initialize API client and headers
     api_client = APIHarnessV2()
     headers = _get_headers()
 
-    # Read CSV data
-    csv_data_result = _read_csv_data(request, logger)
-    df = csv_data_result["dataframe"]
-    source_filename = csv_data_result["source_filename"]
-
-    # Transform and validate data
     import_timestamp = int(time.time())
-    transformed_records = _process_dataframe(df, source_filename, import_timestamp)
+    dead_letter_sink = _get_dead_letter_sink(request)
+    dedup_policy = request.body.get("dedup_policy", "last")
+    dedup_seen_set = request.body.get("dedup_seen_set", "exact")
+    _validate_dedup_options(dedup_policy, dedup_seen_set)
+    dead_letters = []
+    replayed_entries = []
+
+    if request.body.get("retry_failed"):
+        # Replay only the rows recorded in the dead-letter sink
+        if dead_letter_sink is None:
+            raise ValueError("retry_failed requires dead_letter_path or dead_letter_collection")
+        replayed_entries = load_dead_letters(api_client, dead_letter_sink, collection_name, headers)
+        parse_results = _process_dead_letters(replayed_entries, import_timestamp, dead_letters)
+    else:
+        parse_results = _parse_csv_request(request, import_timestamp, dead_letters, logger)
 
-    # Import records to Collection with batch processing
-    import_results = batch_import_records(api_client, transformed_records, collection_name, headers)
+    upload_context = {
+        "api_client": api_client,
+        "collection_name": collection_name,
+        "headers": headers,
+        "dead_letters": dead_letters,
+        "job": job,
+        "rows_queued": 0
+    }
+    import_results = {"success_count": 0, "error_count": 0}
+    counts = _import_chunks(parse_results, {"policy": dedup_policy, "seen_set": dedup_seen_set},
+                            lambda records: _upload_records(upload_context, records, import_results), job)
+    logger.info(f"Removed {counts['duplicate_rows']} duplicate rows")
 
-    return _create_success_response({
-        "df": df,
-        "transformed_records": transformed_records,
+    if dead_letter_sink is not None:
+        write_dead_letters(api_client, dead_letter_sink, collection_name, headers, {
+            "dead_letters": dead_letters,
+            "replayed_entries": replayed_entries
+        })
+        logger.info(f"Recorded {len(dead_letters)} failed rows in dead-letter sink")
+
+    return {
+        "total_rows": counts["total_rows"],
+        "processed_rows": counts["processed_rows"],
+        "duplicate_rows": counts["duplicate_rows"],
+        "dead_letter_rows": len(dead_letters),
         "import_results": import_results,
         "collection_name": collection_name,
-        "source_filename": source_filename,
+        "source_filename": parse_results["source_filename"],
         "import_timestamp": import_timestamp
-    })
+    }
+
+
+def _import_chunks(
+    parse_results: Dict[str, Any],
+    dedup_options: Dict[str, str],
+    upload_records: Callable[[List[Dict[str, Any]]], None],
+    job: ImportJob | None = None
+) -> Dict[str, int]:
+    """Deduplicate parsed chunks and pass the surviving records to upload_records, returning row counts."""
+    counts = {"total_rows": 0, "processed_rows": 0, "duplicate_rows": 0}
+    streaming = dedup_options["policy"] in ["none", "first"]
+    seen = _create_seen_set(dedup_options["seen_set"]) if dedup_options["policy"] == "first" else None
+    collected_records = []
+
+    try:
+        for chunk in parse_results["chunks"]:
+            counts["total_rows"] += chunk["total_rows"]
+            counts["processed_rows"] += len(chunk["transformed_records"])
+            if job is not None:
+                job.parsing(parse_results["source_filename"], counts["total_rows"])
+
+            records = chunk["transformed_records"]
+            if seen is not None:
+                # Later rows with an event_id that was already kept are dropped as they arrive
+                records = [record for record in records if seen.add(record["event_id"])]
+                counts["duplicate_rows"] += len(chunk["transformed_records"]) - len(records)
+
+            if streaming:
+                upload_records(records)
+            else:
+                collected_records.extend(records)
+    finally:
+        if seen is not None:
+            seen.close()
+
+    if not streaming:
+        # Drop rows that share an event_id so each object key is written once
+        dedup_results = deduplicate_records(collected_records, dedup_options["policy"], dedup_options["seen_set"])
+        counts["duplicate_rows"] = dedup_results["duplicate_rows"]
+        upload_records(dedup_results["records"])
+
+    return counts
+
+
+def _parse_csv_request(
+    request: Request,
+    import_timestamp: int,
+    dead_letters: List[Dict[str, Any]],
+    logger: Logger
+) -> Dict[str, Any]:
+    """Parse and transform the CSV data referenced by the request.
+
+    Returns the source filename and an iterable of chunks, each with the number of
+    rows read and the records that passed validation, in file order.
+    """
+    parallel_workers = _get_parallel_workers(request)
+
+    if parallel_workers > 1 and "csv_data" not in request.body:
+        # Parse and transform byte ranges of the file across a process pool
+        csv_file_path = _resolve_csv_file_path(request.body["csv_file_path"], logger)
+        source_filename = os.path.basename(csv_file_path)
+        chunks = iter_csv_file_parallel(csv_file_path, source_filename, import_timestamp,
+                                        parallel_workers, logger, dead_letters)
+    elif "csv_data" in request.body:
+        # CSV data provided as string
+        source_filename = "direct_upload"
+        chunks = _iter_csv_chunks(io.StringIO(request.body["csv_data"]), source_filename, import_timestamp,
+                                  dead_letters)
+    else:
+        # CSV file path provided
+        csv_file_path = _resolve_csv_file_path(request.body["csv_file_path"], logger)
+        source_filename = os.path.basename(csv_file_path)
+        chunks = _iter_csv_chunks(csv_file_path, source_filename, import_timestamp, dead_letters)
+
+    return {"chunks": chunks, "source_filename": source_filename}
+
+
+def _upload_records(upload_context: Dict[str, Any], records: List[Dict[str, Any]],
+                    import_results: Dict[str, int]) -> None:
+    """Upload one chunk of records, adding its counts to import_results."""
+    if not records:
+        return
+
+    job = upload_context["job"]
+    upload_context["rows_queued"] += len(records)
+    if job is not None:
+        job.uploading(upload_context["rows_queued"])
+
+    # Rate limiting: pause between chunks as well as between batches
+    if import_results["success_count"] or import_results["error_count"]:
+        time.sleep(0.5)
+
+    previous = dict(import_results)
+
+    def progress_callback(success_count: int, error_count: int) -> None:
+        if job is not None:
+            job.uploaded(previous["success_count"] + success_count, previous["error_count"] + error_count)
+
+    chunk_results = batch_import_records(upload_context["api_client"], records, upload_context["collection_name"],
+                                         upload_context["headers"], dead_letters=upload_context["dead_letters"],
+                                         progress_callback=progress_callback)
+    import_results["success_count"] += chunk_results["success_count"]
+    import_results["error_count"] += chunk_results["error_count"]
 
 
 def _get_headers() -> Dict[str, str]:
@@ -97,30 +495,175 @@ def _get_headers() -> Dict[str, str]:
     return headers
 
 
-def _read_csv_data(request: Request, logger: Logger) -> Dict[str, Any]:
-    """Read CSV data from request body or file path."""
-    if "csv_data" in request.body:
-        # CSV data provided as string
-        csv_string = request.body["csv_data"]
-        df = pd.read_csv(io.StringIO(csv_string))
-        source_filename = "direct_upload"
-    else:
-        # CSV file path provided
-        csv_file_path = request.body["csv_file_path"]
+def _iter_csv_chunks(
+    source: Any,
+    source_filename: str,
+    import_timestamp: int,
+    dead_letters: List[Dict[str, Any]] | None = None
+) -> Iterator[Dict[str, Any]]:
+    """Read CSV data in chunks of CSV_CHUNK_ROWS rows and transform each chunk."""
+    # Creating the reader raises EmptyDataError for empty input before any chunk is read
+    reader = pd.read_csv(source, chunksize=CSV_CHUNK_ROWS, **CSV_READ_OPTIONS)
 
-        # If it's just a filename (no directory separators), prepend current directory
-        if not os.path.dirname(csv_file_path):
-            csv_file_path = os.path.join(os.getcwd(), csv_file_path)
-            logger.debug(f"After: {csv_file_path}")
+    def chunks() -> Iterator[Dict[str, Any]]:
+        with reader:
+            for df in reader:
+                yield {
+                    "total_rows": len(df),
+                    "transformed_records": _process_dataframe(df, source_filename, import_timestamp, dead_letters)
+                }
 
-        df = pd.read_csv(csv_file_path)
-        source_filename = os.path.basename(csv_file_path)
+    return chunks()
 
-    return {"dataframe": df, "source_filename": source_filename}
 
+def _resolve_csv_file_path(csv_file_path: str, logger: Logger) -> str:
+    """Resolve a CSV file path, treating bare filenames as relative to the current directory."""
+    # If it's just a filename (no directory separators), prepend current directory
+    if not os.path.dirname(csv_file_path):
+        csv_file_path = os.path.join(os.getcwd(), csv_file_path)
+        logger.debug(f"After: {csv_file_path}")
+    return csv_file_path
 
-def _process_dataframe(df: pd.DataFrame, source_filename: str, import_timestamp: int) -> List[Dict[str, Any]]:
-    """Process dataframe and transform records."""
+
+def _get_parallel_workers(request: Request) -> int:
+    """Get the number of parse workers requested for csv_file_path imports."""
+    parallel_workers = request.body.get("parallel_workers", 1)
+    if isinstance(parallel_workers, bool) or not isinstance(parallel_workers, int) or parallel_workers < 1:
+        raise ValueError(f"parallel_workers must be a positive integer, got {parallel_workers!r}")
+    return parallel_workers
+
+
+def parse_csv_file_parallel(
+    csv_file_path: str,
+    source_filename: str,
+    import_timestamp: int,
+    workers: int,
+    logger: Logger,
+    dead_letters: List[Dict[str, Any]] | None = None
+) -> Dict[str, Any]:
+    """Parse and transform a local CSV file across a process pool, collecting every shard."""
+    total_rows = 0
+    transformed_records = []
+
+    for shard_result in iter_csv_file_parallel(csv_file_path, source_filename, import_timestamp,
+                                               workers, logger, dead_letters):
+        total_rows += shard_result["total_rows"]
+        transformed_records.extend(shard_result["transformed_records"])
+
+    return {
+        "total_rows": total_rows,
+        "transformed_records": transformed_records
+    }
+
+
+def iter_csv_file_parallel(
+    csv_file_path: str,
+    source_filename: str,
+    import_timestamp: int,
+    workers: int,
+    logger: Logger,
+    dead_letters: List[Dict[str, Any]] | None = None
+) -> Iterator[Dict[str, Any]]:
+    """Parse and transform a local CSV file across a process pool, yielding shards in file order.
+
+    The file is memory-mapped and split on line boundaries into byte ranges of at
+    most MAX_SHARD_BYTES, with at least one range per worker. Each range is parsed
+    and transformed in a separate process. At most two shards per worker are in
+    flight, so memory stays bounded when the consumer is slower than the parsers.
+    Quoted fields containing line breaks are not supported in this mode.
+    """
+    if os.path.getsize(csv_file_path) == 0:
+        raise pd.errors.EmptyDataError("No columns to parse from file")
+
+    with open(csv_file_path, "rb") as csv_file:
+        with mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            header_end = mapped.find(b"\n") + 1 or len(mapped)
+            columns = list(pd.read_csv(io.BytesIO(mapped[:header_end]), nrows=0, **CSV_READ_OPTIONS).columns)
+            shard_count = max(workers, math.ceil((len(mapped) - header_end) / MAX_SHARD_BYTES))
+            shard_ranges = _compute_shard_ranges(mapped, header_end, shard_count)
+
+    shard_args = [
+        {
+            "csv_file_path": csv_file_path,
+            "start": start,
+            "end": end,
+            "columns": columns,
+            "source_filename": source_filename,
+            "import_timestamp": import_timestamp
+        }
+        for start, end in shard_ranges
+    ]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending_args = iter(shard_args)
+        in_flight = deque(executor.submit(_parse_csv_shard, args) for args in _take(pending_args, workers * 2))
+        shard_number = 0
+
+        # Futures are consumed in submission order, preserving file order
+        while in_flight:
+            shard_result = in_flight.popleft().result()
+            for args in _take(pending_args, 1):
+                in_flight.append(executor.submit(_parse_csv_shard, args))
+
+            shard_number += 1
+            if dead_letters is not None:
+                dead_letters.extend(shard_result["dead_letters"])
+            logger.info(f"Parsed shard {shard_number}/{len(shard_args)}: "
+                        f"{shard_result['total_rows']} rows, {len(shard_result['transformed_records'])} valid")
+            yield shard_result
+
+
+def _take(iterator: Iterator[Any], count: int) -> List[Any]:
+    """Take up to count items from an iterator."""
+    return [item for _, item in zip(range(count), iterator)]
+
+
+def _compute_shard_ranges(mapped: mmap.mmap, start: int, shard_count: int) -> List[Tuple[int, int]]:
+    """Split a memory-mapped file into byte ranges that end on line boundaries."""
+    size = len(mapped)
+    shard_size = max(1, (size - start) // shard_count)
+    shard_ranges = []
+
+    while start < size:
+        end = min(start + shard_size, size)
+        if end < size:
+            # Extend the range to the end of the current line
+            newline = mapped.find(b"\n", end - 1)
+            end = size if newline == -1 else newline + 1
+        shard_ranges.append((start, end))
+        start = end
+
+    return shard_ranges
+
+
+def _parse_csv_shard(shard_args: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse and transform a single byte range of a CSV file in a worker process."""
+    with open(shard_args["csv_file_path"], "rb") as csv_file:
+        with mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            shard_bytes = mapped[shard_args["start"]:shard_args["end"]]
+
+    if not shard_bytes.strip():
+        return {"total_rows": 0, "transformed_records": [], "dead_letters": []}
+
+    df = pd.read_csv(io.BytesIO(shard_bytes), header=None, names=shard_args["columns"], **CSV_READ_OPTIONS)
+    dead_letters = []
+    transformed_records = _process_dataframe(df, shard_args["source_filename"], shard_args["import_timestamp"],
+                                             dead_letters)
+
+    return {
+        "total_rows": len(df),
+        "transformed_records": transformed_records,
+        "dead_letters": dead_letters
+    }
+
+
+def _process_dataframe(
+    df: pd.DataFrame,
+    source_filename: str,
+    import_timestamp: int,
+    dead_letters: List[Dict[str, Any]] | None = None
+) -> List[Dict[str, Any]]:
+    """Process dataframe and transform records, recording rejected rows in dead_letters."""
     transformed_records = []
 
     for index, row in df.iterrows():
@@ -135,15 +678,314 @@ def _process_dataframe(df: pd.DataFrame, source_filename: str, import_timestamp:
 
         except ValueError as row_error:
             print(f"Error processing row {index}: {str(row_error)}")
+            if dead_letters is not None:
+                dead_letters.append({
+                    "stage": "validation",
+                    "reason": str(row_error),
+                    "csv_source": source_filename,
+                    "row": _row_to_dict(row)
+                })
             continue
 
     return transformed_records
 
 
+def _row_to_dict(row: pd.Series) -> Dict[str, Any]:
+    """Convert a CSV row to a JSON-serializable dict, mapping missing values to None."""
+    return {str(key): None if pd.isna(value) else value for key, value in row.to_dict().items()}
+
+
+DEAD_LETTER_COLLECTION = "import_dead_letters"
+
+
+def _get_dead_letter_sink(request: Request) -> Dict[str, str] | None:
+    """Get the dead-letter sink configured for the request, if any."""
+    dead_letter_path = request.body.get("dead_letter_path")
+    dead_letter_collection = request.body.get("dead_letter_collection")
+
+    if dead_letter_path and dead_letter_collection:
+        raise ValueError("Only one of dead_letter_path or dead_letter_collection may be set")
+    if dead_letter_path:
+        return {"type": "file", "path": dead_letter_path}
+    if dead_letter_collection:
+        return {"type": "collection", "collection_name": dead_letter_collection}
+    return None
+
+
+def load_dead_letters(
+    api_client: APIHarnessV2,
+    sink: Dict[str, str],
+    collection_name: str,
+    headers: Dict[str, str],
+    page_size: int = 100
+) -> List[Dict[str, Any]]:
+    """Load dead-letter entries recorded for the target collection."""
+    if sink["type"] == "file":
+        if not os.path.exists(sink["path"]):
+            return []
+        with open(sink["path"], "r", encoding="utf-8") as dead_letter_file:
+            entries = [json.loads(line) for line in dead_letter_file if line.strip()]
+        return [entry for entry in entries if entry["target_collection"] == collection_name]
+
+    entries = []
+    offset = 0
+    while True:
+        search_response = api_client.command("SearchObjects",
+                                             filter=f"target_collection:'{collection_name}'",
+                                             collection_name=sink["collection_name"],
+                                             limit=page_size,
+                                             offset=offset,
+                                             headers=headers)
+        if search_response["status_code"] != 200:
+            raise ConnectionError(f"SearchObjects failed on {sink['collection_name']}: "
+                                  f"{search_response['status_code']}")
+        resources = search_response.get("body", {}).get("resources", [])
+
+        # SearchObjects returns metadata, not actual objects, so use GetObject for details
+        for resource in resources:
+            object_details = api_client.command("GetObject",
+                                                collection_name=sink["collection_name"],
+                                                object_key=resource["object_key"],
+                                                headers=headers)
+            if not isinstance(object_details, bytes):
+                raise ConnectionError(f"GetObject failed for dead letter {resource['object_key']}: "
+                                      f"{object_details.get('status_code')}")
+            entries.append(json.loads(object_details.decode("utf-8")))
+
+        if len(resources) < page_size:
+            return entries
+        offset += page_size
+
+
+def write_dead_letters(
+    api_client: APIHarnessV2,
+    sink: Dict[str, str],
+    collection_name: str,
+    headers: Dict[str, str],
+    dead_letter_data: Dict[str, List[Dict[str, Any]]]
+) -> None:
+    """Record failed rows in the sink, replacing any entries that were replayed.
+
+    In the collection sink, new entries are written before replayed entries are
+    deleted, so a failed write leaves the replayed entries in place to retry.
+    """
+    failed_at = int(time.time())
+    new_entries = [
+        {
+            **dead_letter,
+            "dead_letter_id": str(uuid.uuid4()),
+            "target_collection": collection_name,
+            "failed_at": failed_at
+        }
+        for dead_letter in dead_letter_data["dead_letters"]
+    ]
+    replayed_ids = {entry["dead_letter_id"] for entry in dead_letter_data["replayed_entries"]}
+
+    if sink["type"] == "file":
+        if replayed_ids:
+            # Rewrite the file without the replayed entries
+            with open(sink["path"], "r", encoding="utf-8") as dead_letter_file:
+                kept_lines = [line for line in dead_letter_file
+                              if line.strip() and json.loads(line)["dead_letter_id"] not in replayed_ids]
+            mode = "w"
+        else:
+            kept_lines = []
+            mode = "a"
+        with open(sink["path"], mode, encoding="utf-8") as dead_letter_file:
+            dead_letter_file.writelines(kept_lines)
+            dead_letter_file.writelines(json.dumps(entry) + "\n" for entry in new_entries)
+        return
+
+    for entry in new_entries:
+        response = api_client.command("PutObject",
+                                      body=entry,
+                                      collection_name=sink["collection_name"],
+                                      object_key=entry["dead_letter_id"],
+                                      headers=headers)
+        if response["status_code"] != 200:
+            raise ConnectionError(f"Failed to record dead letter in {sink['collection_name']}: "
+                                  f"{response['status_code']}")
+
+    for dead_letter_id in replayed_ids:
+        response = api_client.command("DeleteObject",
+                                      collection_name=sink["collection_name"],
+                                      object_key=dead_letter_id,
+                                      headers=headers)
+        # A missing entry was already removed, for example by an earlier retry
+        if response["status_code"] not in [200, 404]:
+            raise ConnectionError(f"Failed to remove replayed dead letter {dead_letter_id}: "
+                                  f"{response['status_code']}")
+
+
+def _process_dead_letters(
+    entries: List[Dict[str, Any]],
+    import_timestamp: int,
+    dead_letters: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Rebuild records from dead-letter entries for replay."""
+    transformed_records = []
+
+    for entry in entries:
+        if entry["stage"] == "upload":
+            transformed_records.append({**entry["record"], "imported_at": import_timestamp})
+            continue
+
+        # Rows rejected during validation are transformed again from the original row
+        try:
+            record = transform_csv_row(pd.Series(entry["row"]), entry["csv_source"], import_timestamp)
+            validate_record(record)
+            transformed_records.append(record)
+        except ValueError as row_error:
+            dead_letters.append({**entry, "reason": str(row_error)})
+
+    return {
+        "chunks": [{"total_rows": len(entries), "transformed_records": transformed_records}],
+        "source_filename": "dead_letter_retry"
+    }
+
+
+DEDUP_POLICIES = ["none", "first", "last", "latest"]
+SEEN_SET_MODES = ["exact", "bloom"]
+
+# Sizes the streaming bloom filter (about 12 MB at a 1% false positive rate);
+# more keys than this still deduplicate exactly but check the spill file more often
+BLOOM_EXPECTED_KEYS = 10_000_000
+
+
+def deduplicate_records(records: List[Dict[str, Any]], policy: str, seen_set_mode: str) -> Dict[str, Any]:
+    """Remove records that share an event_id according to the dedup policy.
+
+    Policies:
+        none: keep every record
+        first: keep the first occurrence of each event_id
+        last: keep the last occurrence of each event_id
+        latest: keep the occurrence with the highest timestamp_unix (last one on ties)
+
+    Surviving records keep their original file order. The bloom seen set is only
+    accepted with the first policy, where run_import applies it to each chunk as
+    it is parsed; last and latest need every record in memory regardless.
+    """
+    _validate_dedup_options(policy, seen_set_mode)
+
+    if policy == "none":
+        return {"records": records, "duplicate_rows": 0}
+
+    # Every policy is "first wins" over a different visiting order
+    if policy == "first":
+        order = range(len(records))
+    elif policy == "last":
+        order = range(len(records) - 1, -1, -1)
+    else:
+        order = sorted(range(len(records)), key=lambda i: (records[i]["timestamp_unix"], i), reverse=True)
+
+    seen = _create_seen_set(seen_set_mode)
+    try:
+        kept = [index for index in order if seen.add(records[index]["event_id"])]
+    finally:
+        seen.close()
+
+    if policy != "first":
+        kept.sort()
+
+    return {
+        "records": [records[index] for index in kept],
+        "duplicate_rows": len(records) - len(kept)
+    }
+
+
+def _validate_dedup_options(policy: str, seen_set_mode: str) -> None:
+    """Validate the dedup_policy and dedup_seen_set request options."""
+    if policy not in DEDUP_POLICIES:
+        raise ValueError(f"Invalid dedup_policy: {policy}. Must be one of {DEDUP_POLICIES}")
+    if seen_set_mode not in SEEN_SET_MODES:
+        raise ValueError(f"Invalid dedup_seen_set: {seen_set_mode}. Must be one of {SEEN_SET_MODES}")
+    if seen_set_mode == "bloom" and policy in ["last", "latest"]:
+        raise ValueError(f"dedup_seen_set bloom requires dedup_policy first, got {policy}")
+
+
+def _create_seen_set(seen_set_mode: str) -> Any:
+    """Create the seen set used to drop repeated event IDs."""
+    return BloomSeenSet(BLOOM_EXPECTED_KEYS) if seen_set_mode == "bloom" else ExactSeenSet()
+
+
+class ExactSeenSet:
+    """In-memory set of event IDs that have already been kept."""
+
+    def __init__(self):
+        self._keys = set()
+
+    def add(self, key: str) -> bool:
+        """Add a key, returning True if it had not been seen before."""
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        return True
+
+    def close(self) -> None:
+        """Release the stored keys."""
+        self._keys.clear()
+
+
+class BloomSeenSet:
+    """Bloom filter of event IDs with exact keys spilled to a temporary SQLite file.
+
+    Keys the filter has never seen are definitely new and are queued for a batched
+    insert. Only keys the filter reports as possibly seen are checked against the
+    spill file, so memory stays bounded by the filter size for very large files.
+    """
+
+    def __init__(self, expected_keys: int, false_positive_rate: float = 0.01, flush_size: int = 10000):
+        expected_keys = max(expected_keys, 1)
+        self._num_bits = max(8, int(-expected_keys * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self._num_hashes = max(1, round(self._num_bits / expected_keys * math.log(2)))
+        self._bits = bytearray((self._num_bits + 7) // 8)
+        self._pending = []
+        self._flush_size = flush_size
+        self._spill_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self._db = sqlite3.connect(os.path.join(self._spill_dir.name, "seen.db"))
+        self._db.execute("CREATE TABLE seen (key TEXT PRIMARY KEY)")
+
+    def add(self, key: str) -> bool:
+        """Add a key, returning True if it had not been seen before."""
+        positions = self._positions(key)
+        maybe_seen = all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in positions)
+
+        if maybe_seen:
+            # Resolve possible false positives against the exact spill
+            self._flush()
+            if self._db.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone():
+                return False
+
+        for pos in positions:
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self._pending.append((key,))
+        if len(self._pending) >= self._flush_size:
+            self._flush()
+        return True
+
+    def close(self) -> None:
+        """Close and remove the spill file."""
+        self._db.close()
+        self._spill_dir.cleanup()
+
+    def _positions(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self._num_bits for i in range(self._num_hashes)]
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._db.executemany("INSERT INTO seen (key) VALUES (?)", self._pending)
+            self._pending = []
+
+
 def _create_success_response(response_data: Dict[str, Any]) -> Response:
     """Create success response with import results."""
-    df = response_data["df"]
-    transformed_records = response_data["transformed_records"]
+    total_rows = response_data["total_rows"]
+    processed_rows = response_data["processed_rows"]
+    duplicate_rows = response_data["duplicate_rows"]
+    dead_letter_rows = response_data["dead_letter_rows"]
     import_results = response_data["import_results"]
     collection_name = response_data["collection_name"]
     source_filename = response_data["source_filename"]
@@ -152,10 +994,12 @@ def _create_success_response(response_data: Dict[str, Any]) -> Response:
     return Response(
         body={
             "success": import_results["success_count"] > 0,
-            "total_rows": len(df),
-            "processed_rows": len(transformed_records),
+            "total_rows": total_rows,
+            "processed_rows": processed_rows,
+            "duplicate_rows": duplicate_rows,
             "imported_records": import_results["success_count"],
             "failed_records": import_results["error_count"],
+            "dead_letter_rows": dead_letter_rows,
             "collection_name": collection_name,
             "source_file": source_filename,
             "import_timestamp": import_timestamp
@@ -226,9 +1070,16 @@ def batch_import_records(
     records: List[Dict[str, Any]],
     collection_name: str,
     headers: Dict[str, str],
-    batch_size: int = 50
+    batch_size: int = 50,
+    dead_letters: List[Dict[str, Any]] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None
 ) -> Dict[str, int]:
-    """Import records to Collection in batches with rate limiting."""
+    """Import records to Collection in batches with rate limiting.
+
+    Records that fail to import are appended to dead_letters when it is provided.
+    progress_callback is called with the cumulative success and error counts after
+    each batch.
+    """
 
     success_count = 0
     error_count = 0
@@ -245,13 +1096,17 @@ def batch_import_records(
             "batch": batch,
             "collection_name": collection_name,
             "headers": headers,
-            "batch_number": i // batch_size + 1
+            "batch_number": i // batch_size + 1,
+            "dead_letters": dead_letters
         }
 
         batch_results = _process_batch(batch_context)
         success_count += batch_results["success_count"]
         error_count += batch_results["error_count"]
 
+        if progress_callback is not None:
+            progress_callback(success_count, error_count)
+
     return {
         "success_count": success_count,
         "error_count": error_count
@@ -265,11 +1120,14 @@ def _process_batch(batch_context: Dict[str, Any]) -> Dict[str, int]:
     collection_name = batch_context["collection_name"]
     headers = batch_context["headers"]
     batch_number = batch_context["batch_number"]
+    dead_letters = batch_context.get("dead_letters")
 
     success_count = 0
     error_count = 0
 
     for record in batch:
+        # Write time lets readers pick up records from imports that started earlier
+        record["uploaded_at"] = int(time.time())
         try:
             response = api_client.command("PutObject",
                                           body=record,
@@ -282,13 +1140,18 @@ def _process_batch(batch_context: Dict[str, Any]) -> Dict[str, int]:
             else:
                 error_count += 1
                 print(f"Failed to import record {record['event_id']}: {response}")
+                _record_upload_failure(dead_letters, record,
+                                       f"PutObject returned {response['status_code']}: "
+                                       f"{response.get('body', {}).get('errors', [])}")
 
         except (ConnectionError, TimeoutError) as conn_error:
             error_count += 1
             print(f"Connection error importing record {record.get('event_id', 'unknown')}: {str(conn_error)}")
+            _record_upload_failure(dead_letters, record, f"Connection error: {str(conn_error)}")
         except KeyError as key_error:
             error_count += 1
             print(f"Key error importing record {record.get('event_id', 'unknown')}: {str(key_error)}")
+            _record_upload_failure(dead_letters, record, f"Key error: {str(key_error)}")
 
     print(f"Processed batch {batch_number}: {len(batch)} records")
 
@@ -298,5 +1161,16 @@ def _process_batch(batch_context: Dict[str, Any]) -> Dict[str, int]:
     }
 
 
+def _record_upload_failure(dead_letters: List[Dict[str, Any]] | None, record: Dict[str, Any], reason: str) -> None:
+    """Append a failed upload to the dead-letter list, if one is being collected."""
+    if dead_letters is not None:
+        dead_letters.append({
+            "stage": "upload",
+            "reason": reason,
+            "csv_source": record.get("csv_source"),
+            "record": record
+        })
+
+
 if __name__ == "__main__":
     FUNC.run()
@@ -0,0 +1,381 @@
+"""Tests for the csv-import function."""
+
+import importlib
+import json
+import logging
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from crowdstrike.foundry.function import Request
+
+import main
+
+
+def mock_handler(*_args, **_kwargs):
+    """Replace FUNC.handler so decorated handlers stay callable."""
+    def identity(func):
+        return func
+    return identity
+
+
+CSV_HEADER = "event_id,timestamp,event_type,severity,source_ip,destination_ip,user,description\n"
+
+
+def _csv_rows(count):
+    """Build CSV rows whose values would be inferred as numbers, NaN or text."""
+    rows = []
+    for i in range(count):
+        event_id = "" if i % 17 == 5 else ("X1" if i % 13 == 3 else str(i))
+        user = "0" if i % 3 == 0 else ("" if i % 3 == 1 else f"user{i}")
+        severity = "bogus" if i % 11 == 7 else ["low", "medium", "high", "critical"][i % 4]
+        rows.append(f"{event_id},2024-01-0{1 + i % 9}T10:00:00Z,login_failure,{severity},"
+                    f"10.0.0.{i % 255},,{user},row {i}\n")
+    return rows
+
+
+class FnTestCase(unittest.TestCase):
+    """Base test case that reloads main with a pass-through handler decorator."""
+
+    def setUp(self):
+        patcher = patch("crowdstrike.foundry.function.Function.handler", new=mock_handler)
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        importlib.reload(main)
+        self.logger = logging.getLogger("test")
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def write_csv(self, rows):
+        """Write a CSV file with the standard header and return its path."""
+        path = os.path.join(self.tmp_dir.name, "events.csv")
+        with open(path, "w", encoding="utf-8") as csv_file:
+            csv_file.write(CSV_HEADER + "".join(rows))
+        return path
+
+    def single_process(self, path, dead_letters):
+        """Parse a file with the chunked single-process reader."""
+        total_rows = 0
+        records = []
+        for chunk in main._iter_csv_chunks(path, "events.csv", 1700000000, dead_letters):  # pylint: disable=protected-access
+            total_rows += chunk["total_rows"]
+            records.extend(chunk["transformed_records"])
+        return {"total_rows": total_rows, "transformed_records": records}
+
+    def run_import(self, body, api_client):
+        """Run an import with a mocked API client and no rate-limit sleeps."""
+        with patch.object(main, "APIHarnessV2", return_value=api_client), patch.object(main.time, "sleep"):
+            return main.run_import(Request(body=body), "security_events_csv", self.logger)
+
+    def uploaded_keys(self, api_client):
+        """Object keys written to the target collection, in order."""
+        return [call.kwargs["object_key"] for call in api_client.command.call_args_list
+                if call.args[0] == "PutObject" and call.kwargs["collection_name"] == "security_events_csv"]
+
+    @staticmethod
+    def mock_api_client(status_code=200):
+        """Create an API client whose PutObject calls return status_code."""
+        api_client = MagicMock()
+        api_client.command.return_value = {"status_code": status_code, "body": {"resources": []}}
+        return api_client
+
+
+class ParallelParseTestCase(FnTestCase):
+    """The parallel parser must produce exactly what the single-process parser does."""
+
+    def test_parallel_matches_single_process_across_shard_boundaries(self):
+        """Parallel parsing gives the same records and dead letters for any shard layout."""
+        path = self.write_csv(_csv_rows(500))
+        single_dead_letters = []
+        expected = self.single_process(path, single_dead_letters)
+
+        for workers, max_shard_bytes in [(2, main.MAX_SHARD_BYTES), (4, 997), (3, 64)]:
+            with self.subTest(workers=workers, max_shard_bytes=max_shard_bytes):
+                with patch.object(main, "MAX_SHARD_BYTES", max_shard_bytes):
+                    dead_letters = []
+                    actual = main.parse_csv_file_parallel(path, "events.csv", 1700000000, workers,
+                                                          self.logger, dead_letters)
+                self.assertEqual(actual, expected)
+                self.assertEqual(dead_letters, single_dead_letters)
+
+    def test_values_are_not_type_inferred(self):
+        """Numeric-looking values keep their text form."""
+        path = self.write_csv(_csv_rows(4))
+        records = main.parse_csv_file_parallel(path, "events.csv", 1700000000, 2, self.logger)["transformed_records"]
+
+        self.assertEqual([record["event_id"] for record in records], ["0", "1", "2", "X1"])
+        self.assertEqual(records[0]["user"], "0")
+
+    def test_chunked_reader_matches_whole_file(self):
+        """Chunk size does not change the parsed records."""
+        path = self.write_csv(_csv_rows(250))
+        expected = self.single_process(path, [])
+
+        with patch.object(main, "CSV_CHUNK_ROWS", 7):
+            self.assertEqual(self.single_process(path, []), expected)
+
+    def test_empty_file_raises_empty_data_error(self):
+        """An empty file is reported the same way as in the single-process path."""
+        path = self.write_csv([])
+        with open(path, "w", encoding="utf-8"):
+            pass
+
+        with self.assertRaises(main.pd.errors.EmptyDataError):
+            main.parse_csv_file_parallel(path, "events.csv", 1700000000, 2, self.logger)
+
+
+class RunImportTestCase(FnTestCase):
+    """Tests for the import pipeline."""
+
+    def test_streams_chunks_to_upload_when_not_deduplicating(self):
+        """With dedup_policy none, each chunk is uploaded as it is parsed."""
+        path = self.write_csv(_csv_rows(30))
+        api_client = self.mock_api_client()
+
+        with patch.object(main, "CSV_CHUNK_ROWS", 4), \
+                patch.object(main, "batch_import_records", wraps=main.batch_import_records) as batch_import:
+            results = self.run_import({"csv_file_path": path, "dedup_policy": "none"}, api_client)
+
+        self.assertGreater(batch_import.call_count, 1)
+        self.assertEqual(results["total_rows"], 30)
+        self.assertEqual(results["import_results"]["success_count"], results["processed_rows"])
+        self.assertEqual(len(self.uploaded_keys(api_client)), results["processed_rows"])
+
+    def test_parallel_and_single_process_imports_write_the_same_objects(self):
+        """Parallel and single-process imports upload the same object keys."""
+        path = self.write_csv(_csv_rows(200))
+
+        single_client = self.mock_api_client()
+        single_results = self.run_import({"csv_file_path": path}, single_client)
+        parallel_client = self.mock_api_client()
+        with patch.object(main, "MAX_SHARD_BYTES", 500):
+            parallel_results = self.run_import({"csv_file_path": path, "parallel_workers": 3}, parallel_client)
+
+        self.assertEqual(self.uploaded_keys(parallel_client), self.uploaded_keys(single_client))
+        for key in ["total_rows", "processed_rows", "duplicate_rows", "dead_letter_rows"]:
+            self.assertEqual(parallel_results[key], single_results[key])
+
+
+class DeduplicationTestCase(FnTestCase):
+    """Tests for event_id deduplication."""
+
+    @staticmethod
+    def records(*pairs):
+        """Build records from (event_id, timestamp_unix) pairs."""
+        return [{"event_id": event_id, "timestamp_unix": ts, "row": i} for i, (event_id, ts) in enumerate(pairs)]
+
+    def test_policies(self):
+        """Each policy keeps the expected occurrence in file order."""
+        records = self.records(("a", 5), ("b", 1), ("a", 9), ("c", 2), ("a", 3), ("b", 1))
+        expected_rows = {"none": [0, 1, 2, 3, 4, 5], "first": [0, 1, 3], "last": [3, 4, 5], "latest": [2, 3, 5]}
+
+        for policy, rows in expected_rows.items():
+            with self.subTest(policy=policy):
+                results = main.deduplicate_records(records, policy, "exact")
+                self.assertEqual([record["row"] for record in results["records"]], rows)
+                self.assertEqual(results["duplicate_rows"], len(records) - len(rows))
+
+    def test_bloom_seen_set_matches_exact(self):
+        """The Bloom seen set never drops a new key or keeps a repeated one."""
+        seen = main.BloomSeenSet(100, flush_size=7)
+        try:
+            keys = [f"EVT-{i % 150}" for i in range(600)]
+            self.assertEqual([seen.add(key) for key in keys], [i < 150 for i in range(600)])
+        finally:
+            seen.close()
+
+    def test_bloom_requires_first_policy(self):
+        """Bloom cannot bound memory for last or latest, so it is rejected there."""
+        for policy in ["last", "latest"]:
+            with self.subTest(policy=policy), self.assertRaises(ValueError):
+                main.deduplicate_records([], policy, "bloom")
+
+    def test_first_policy_deduplicates_across_streamed_chunks(self):
+        """Streaming first-wins dedup uploads the same records as deduplicating the whole file."""
+        rows = _csv_rows(60)
+        rows += [row.replace(",login_failure,", ",malware_detected,") for row in rows[:20]]
+        path = self.write_csv(rows)
+        expected = main.deduplicate_records(self.single_process(path, [])["transformed_records"], "first", "exact")
+
+        for seen_set in main.SEEN_SET_MODES:
+            with self.subTest(seen_set=seen_set), patch.object(main, "CSV_CHUNK_ROWS", 9), \
+                    patch.object(main, "BLOOM_EXPECTED_KEYS", 50):
+                api_client = self.mock_api_client()
+                results = self.run_import({"csv_file_path": path, "dedup_policy": "first", "dedup_seen_set": seen_set},
+                                          api_client)
+
+                uploaded = [call.kwargs["body"]["description"] for call in api_client.command.call_args_list
+                            if call.args[0] == "PutObject"]
+                self.assertEqual(uploaded, [record["description"] for record in expected["records"]])
+                self.assertEqual(results["duplicate_rows"], expected["duplicate_rows"])
+
+
+class DeadLetterTestCase(FnTestCase):
+    """Tests for the dead-letter sinks and retry."""
+
+    SINK = {"type": "collection", "collection_name": "import_dead_letters"}
+
+    @staticmethod
+    def storage_client(statuses):
+        """Create an API client returning a status per operation and recording the calls."""
+        api_client = MagicMock()
+        api_client.command.side_effect = lambda operation, **_kwargs: {
+            "status_code": statuses.get(operation, 200), "body": {"resources": []}}
+        return api_client
+
+    def test_collection_sink_writes_before_deleting_replayed_entries(self):
+        """Replayed entries are only removed once the new entries are stored."""
+        api_client = self.storage_client({})
+        main.write_dead_letters(api_client, self.SINK, "security_events_csv", {}, {
+            "dead_letters": [{"stage": "upload", "reason": "500", "record": {}}],
+            "replayed_entries": [{"dead_letter_id": "old-1"}]
+        })
+
+        self.assertEqual([call.args[0] for call in api_client.command.call_args_list], ["PutObject", "DeleteObject"])
+
+    def test_collection_sink_keeps_replayed_entries_when_write_fails(self):
+        """A failed write raises and leaves the replayed entries in the sink."""
+        api_client = self.storage_client({"PutObject": 500})
+        with self.assertRaises(ConnectionError):
+            main.write_dead_letters(api_client, self.SINK, "security_events_csv", {}, {
+                "dead_letters": [{"stage": "upload", "reason": "500", "record": {}}],
+                "replayed_entries": [{"dead_letter_id": "old-1"}]
+            })
+
+        self.assertNotIn("DeleteObject", [call.args[0] for call in api_client.command.call_args_list])
+
+    def test_load_raises_when_search_fails(self):
+        """A failed SearchObjects call is not mistaken for an empty sink."""
+        with self.assertRaises(ConnectionError):
+            main.load_dead_letters(self.storage_client({"SearchObjects": 403}), self.SINK, "security_events_csv", {})
+
+    def test_replayed_upload_failures_are_restamped(self):
+        """Replayed records carry the retry's imported_at so incremental readers pick them up."""
+        entry = {"stage": "upload", "reason": "500", "record": {"event_id": "EVT-1", "imported_at": 1000}}
+
+        results = main._process_dead_letters([entry], 2000, [])  # pylint: disable=protected-access
+
+        self.assertEqual(results["chunks"][0]["transformed_records"], [{"event_id": "EVT-1", "imported_at": 2000}])
+        self.assertEqual(entry["record"]["imported_at"], 1000)
+
+    def test_file_sink_retry_replaces_replayed_entries(self):
+        """Retrying from a file sink re-imports failed rows and keeps only rows that fail again."""
+        path = self.write_csv(_csv_rows(12))
+        dead_letter_path = os.path.join(self.tmp_dir.name, "dead_letters.ndjson")
+
+        first = self.run_import({"csv_file_path": path, "dead_letter_path": dead_letter_path}, self.mock_api_client(500))
+        retry = self.run_import({"retry_failed": True, "dead_letter_path": dead_letter_path}, self.mock_api_client())
+        with open(dead_letter_path, "r", encoding="utf-8") as dead_letter_file:
+            remaining = [json.loads(line) for line in dead_letter_file]
+
+        self.assertEqual(first["import_results"]["error_count"], first["processed_rows"])
+        self.assertEqual(retry["import_results"]["success_count"], first["processed_rows"])
+        self.assertEqual(len(remaining), first["total_rows"] - first["processed_rows"])
+        self.assertTrue(all(entry["stage"] == "validation" for entry in remaining))
+
+
+class ImportJobTestCase(FnTestCase):
+    """Tests for background import jobs."""
+
+    def setUp(self):
+        super().setUp()
+        self.api_client = self.mock_api_client()
+        api_patcher = patch.object(main, "APIHarnessV2", return_value=self.api_client)
+        self.addCleanup(api_patcher.stop)
+        api_patcher.start()
+
+    def checkpoints(self):
+        """Job checkpoints saved so far, in order."""
+        return [call.kwargs["body"] for call in self.api_client.command.call_args_list
+                if call.args[0] == "PutObject" and call.kwargs["collection_name"] == main.CHECKPOINT_COLLECTION]
+
+    def test_unexpected_errors_fail_the_job(self):
+        """Errors outside the expected types are still recorded on the job."""
+        job = main.ImportJob("security_events_csv")
+        with patch.object(main, "run_import", side_effect=RuntimeError("worker died")):
+            main._run_import_job(job, Request(body={}), self.logger)  # pylint: disable=protected-access
+
+        self.assertEqual(self.checkpoints()[-1]["status"], "failed")
+        self.assertEqual(self.checkpoints()[-1]["error"], "RuntimeError: worker died")
+
+    def fail_checkpoint_saves(self):
+        """Make checkpoint saves fail while record uploads still succeed."""
+        self.api_client.command.side_effect = lambda operation, **kwargs: {
+            "status_code": 500 if kwargs.get("collection_name") == main.CHECKPOINT_COLLECTION else 200,
+            "body": {"resources": []}
+        }
+
+    def test_failed_checkpoint_saves_do_not_fail_the_import(self):
+        """A checkpoint that cannot be saved when the upload starts does not stop the import."""
+        self.fail_checkpoint_saves()
+        job = main.ImportJob("security_events_csv")
+        with patch.object(main.time, "sleep"):
+            results = main.run_import(Request(body={"csv_file_path": self.write_csv(_csv_rows(5))}), "security_events_csv",
+                                      self.logger, job)
+
+        self.assertEqual(results["import_results"]["success_count"], len(self.uploaded_keys(self.api_client)))
+        self.assertGreater(results["import_results"]["success_count"], 0)
+        self.assertEqual(job.stage, "uploading")
+
+    def test_failure_that_cannot_be_recorded_is_logged(self):
+        """A failed final save does not raise out of the background thread."""
+        self.fail_checkpoint_saves()
+        job = main.ImportJob("security_events_csv")
+        with patch.object(main.time, "sleep"), patch.object(self.logger, "error") as log_error:
+            main._run_import_job(job, Request(body={"csv_file_path": self.write_csv(_csv_rows(5))}), self.logger)  # pylint: disable=protected-access
+
+        self.assertEqual(job.status, "failed")
+        self.assertIn("Failed to record failure", log_error.call_args.args[0])
+
+    def test_start_returns_503_when_the_job_cannot_be_saved(self):
+        """A job whose first checkpoint was not stored is not started."""
+        self.api_client.command.return_value = {"status_code": 500, "body": {}}
+        with patch.object(main.threading, "Thread") as thread:
+            response = main._start_import_job(Request(body={"csv_data": "a\n1\n"}),  # pylint: disable=protected-access
+                                              "security_events_csv", self.logger)
+
+        self.assertEqual(response.code, 503)
+        thread.assert_not_called()
+
+    def test_start_rejects_invalid_options(self):
+        """Option errors return 400 before a job is started, as for synchronous imports."""
+        for body in [{"dedup_policy": "bogus"}, {"dedup_policy": "first", "dedup_seen_set": "bogus"},
+                     {"retry_failed": True}]:
+            with self.subTest(body=body), patch.object(main.threading, "Thread") as thread:
+                response = main.import_csv_handler(Request(body={"csv_data": "a\n1\n", "async": True, **body}),
+                                                   None, self.logger)
+
+                self.assertEqual(response.code, 400)
+                thread.assert_not_called()
+        self.assertEqual(self.checkpoints(), [])
+
+    def test_rows_parsed_is_reported_while_parsing(self):
+        """Checkpoints show parse progress before any row is uploaded."""
+        path = self.write_csv(_csv_rows(40))
+        job = main.ImportJob("security_events_csv")
+        with patch.object(main, "CSV_CHUNK_ROWS", 10), patch.object(main, "CHECKPOINT_INTERVAL_SECONDS", 0):
+            main.run_import(Request(body={"csv_file_path": path, "dedup_policy": "last"}),
+                            "security_events_csv", self.logger, job)
+
+        parsing = [checkpoint["rows_parsed"] for checkpoint in self.checkpoints() if checkpoint["stage"] == "parsing"]
+        self.assertEqual(parsing, [10, 20, 30, 40])
+
+    def test_stale_running_job_is_reported_as_failed(self):
+        """A running job without a recent heartbeat is marked failed."""
+        for age, expected_status in [(10, "running"), (main.STALE_JOB_SECONDS + 1, "failed")]:
+            with self.subTest(age=age):
+                checkpoint = {**main.ImportJob("security_events_csv").to_dict(),
+                              "last_updated": int(main.time.time()) - age}
+                self.api_client.command.side_effect = lambda operation, body=checkpoint, **_kwargs: (
+                    json.dumps(body).encode("utf-8") if operation == "GetObject" else {"status_code": 200})
+
+                response = main.import_status_handler(Request(body={"job_id": checkpoint["job_id"]}), None,
+                                                      self.logger)
+
+                self.assertEqual(response.code, 200)
+                self.assertEqual(response.body["status"], expected_status)
+
+
+if __name__ == "__main__":
+    unittest.main()
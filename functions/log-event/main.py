@@ -1,14 +1,30 @@
 """Main module for the log-event function handler."""
 
+import json
 import os
+import threading
 import time
 import uuid
+from typing import Dict, Any, List
 
 from crowdstrike.foundry.function import Function, Request, Response, APIError
 from falconpy import APIHarnessV2
 
 FUNC = Function.instance()
 
+EVENT_COLLECTION = "event_logs"
+BUCKET_COLLECTION = "event_log_buckets"
+BUCKET_SECONDS = 60
+MAX_EVENTS_PER_PART = 500
+LAYOUTS = ["event", "bucketed"]
+
+# Each function instance appends only to its own bucket parts, so concurrent
+# instances never overwrite each other's events
+_WRITER_ID = uuid.uuid4().hex[:12]
+_OPEN_PARTS: Dict[int, Dict[str, Any]] = {}
+_BUCKET_LOCKS: Dict[int, threading.Lock] = {}
+_PARTS_LOCK = threading.Lock()
+
 
 @FUNC.handler(method="POST", path="/log-event")
 def on_post(request: Request) -> Response:
@@ -17,60 +33,43 @@ def on_post(request: Request) -> Response:
 
     Args:
         request: The incoming request object containing the request body.
+            Set layout to "bucketed" to append to a time-bucketed object instead
+            of storing the event under its own key.
 
     Returns:
         Response: JSON response with event storage result or error message.
     """
     # Validate request
-    if "event_data" not in request.body:
+    validation_error = _validate_log_request(request.body)
+    if validation_error:
         return Response(
             code=400,
-            errors=[APIError(code=400, message="missing event_data")]
+            errors=[APIError(code=400, message=validation_error)]
         )
 
     event_data = request.body["event_data"]
+    layout = request.body.get("layout", "event")
 
     try:
-        # Store data in a collection
-        # This assumes you've already created a collection named "event_logs"
-        event_id = str(uuid.uuid4())
-        json_data = {
-            "event_id": event_id,
-            "data": event_data,
-            "timestamp": int(time.time())
-        }
-
         # Allow setting APP_ID as an env variable for local testing
-        headers = {}
-        if os.environ.get("APP_ID"):
-            headers = {
-                "X-CS-APP-ID": os.environ.get("APP_ID")
-            }
-
+        headers = _get_headers()
         api_client = APIHarnessV2()
-        collection_name = "event_logs"
 
-        response = api_client.command("PutObject",
-                                      body=json_data,
-                                      collection_name=collection_name,
-                                      object_key=event_id,
-                                      headers=headers
-                                      )
+        if layout == "bucketed":
+            return _store_bucketed(api_client, event_data, headers)
+
+        # Store data in a collection
+        # This assumes you've already created a collection named "event_logs"
+        event_id = str(uuid.uuid4())
+        response = store_event(api_client, event_id, event_data, headers)
 
         if response["status_code"] != 200:
-            error_message = response.get("error", {}).get("message", "Unknown error")
-            return Response(
-                code=response["status_code"],
-                errors=[APIError(
-                    code=response["status_code"],
-                    message=f"Failed to store event: {error_message}"
-                )]
-            )
+            return _storage_error(response)
 
         # Query the collection to retrieve the event by id
         query_response = api_client.command("SearchObjects",
                                             filter=f"event_id:'{event_id}'",
-                                            collection_name=collection_name,
+                                            collection_name=EVENT_COLLECTION,
                                             limit=5,
                                             headers=headers
                                             )
@@ -89,5 +88,275 @@ def on_post(request: Request) -> Response:
         )
 
 
+@FUNC.handler(method="POST", path="/read-events")
+def read_events_handler(request: Request) -> Response:
+    """
+    Handle POST requests to /read-events endpoint.
+
+    Args:
+        request: The incoming request object with start_time and end_time Unix
+            timestamps and an optional layout ("event" or "bucketed").
+
+    Returns:
+        Response: JSON response with the events in [start_time, end_time) or error message.
+    """
+    start_time = request.body.get("start_time")
+    end_time = request.body.get("end_time")
+    layout = request.body.get("layout", "event")
+
+    if not isinstance(start_time, int) or not isinstance(end_time, int):
+        return Response(
+            code=400,
+            errors=[APIError(code=400, message="start_time and end_time are required integers")]
+        )
+    if layout not in LAYOUTS:
+        return Response(
+            code=400,
+            errors=[APIError(code=400, message=f"invalid layout: {layout}. Must be one of {LAYOUTS}")]
+        )
+
+    try:
+        read_results = read_events_range(APIHarnessV2(), layout, start_time, end_time, _get_headers())
+        return Response(
+            body={
+                "events": read_results["events"],
+                "count": len(read_results["events"]),
+                "objects_read": read_results["objects_read"]
+            },
+            code=200
+        )
+    except (ConnectionError, ValueError, KeyError) as e:
+        return Response(
+            code=500,
+            errors=[APIError(code=500, message=f"Error reading collection: {str(e)}")]
+        )
+
+
+def _validate_log_request(body: Dict[str, Any]) -> str | None:
+    """Return an error message if the /log-event request body is invalid."""
+    if "event_data" not in body:
+        return "missing event_data"
+
+    layout = body.get("layout", "event")
+    if layout not in LAYOUTS:
+        return f"invalid layout: {layout}. Must be one of {LAYOUTS}"
+
+    # event_logs stores event_data as an object, so lists are only accepted as a batch of bucketed events
+    if isinstance(body["event_data"], list):
+        if layout != "bucketed":
+            return "event_data must be an object unless layout is bucketed"
+        if not body["event_data"]:
+            return "event_data must contain at least one event"
+
+    return None
+
+
+def _get_headers() -> Dict[str, str]:
+    """Get headers for API requests."""
+    headers = {}
+    if os.environ.get("APP_ID"):
+        headers = {
+            "X-CS-APP-ID": os.environ.get("APP_ID")
+        }
+    return headers
+
+
+def _storage_error(response: Dict[str, Any]) -> Response:
+    """Build an error response from a failed PutObject response."""
+    error_message = response.get("error", {}).get("message", "Unknown error")
+    return Response(
+        code=response["status_code"],
+        errors=[APIError(
+            code=response["status_code"],
+            message=f"Failed to store event: {error_message}"
+        )]
+    )
+
+
+def _store_bucketed(api_client: APIHarnessV2, event_data: Any, headers: Dict[str, str]) -> Response:
+    """Append one event, or a list of events, to the current time bucket."""
+    timestamp = int(time.time())
+    events = [
+        {"event_id": str(uuid.uuid4()), "data": data, "timestamp": timestamp}
+        for data in (event_data if isinstance(event_data, list) else [event_data])
+    ]
+
+    append_results = append_to_bucket(api_client, events, headers)
+    if append_results["response"]["status_code"] != 200:
+        return _storage_error(append_results["response"])
+
+    return Response(
+        body={
+            "stored": True,
+            "event_ids": [event["event_id"] for event in events],
+            "bucket_key": append_results["part_key"]
+        },
+        code=200
+    )
+
+
+def store_event(api_client: APIHarnessV2, event_id: str, event_data: Any, headers: Dict[str, str]) -> Dict[str, Any]:
+    """Store a single event under its own object key."""
+    json_data = {
+        "event_id": event_id,
+        "data": event_data,
+        "timestamp": int(time.time())
+    }
+
+    return api_client.command("PutObject",
+                              body=json_data,
+                              collection_name=EVENT_COLLECTION,
+                              object_key=event_id,
+                              headers=headers
+                              )
+
+
+def append_to_bucket(api_client: APIHarnessV2, events: List[Dict[str, Any]], headers: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Append events to this instance's open part for their time bucket.
+
+    Parts hold at most MAX_EVENTS_PER_PART events (unless a single append is
+    larger) and are rewritten with one PutObject per append. The part's indexed
+    bucket_start acts as the manifest used by range reads.
+
+    Returns:
+        Dict with the PutObject response and the key of the part written.
+    """
+    timestamp = events[0]["timestamp"]
+    bucket_start = timestamp - timestamp % BUCKET_SECONDS
+
+    with _PARTS_LOCK:
+        # Parts for buckets that have closed will not receive more events
+        for closed_start in [start for start in _OPEN_PARTS if start < bucket_start]:
+            del _OPEN_PARTS[closed_start]
+        for closed_start in [start for start in _BUCKET_LOCKS if start < bucket_start]:
+            del _BUCKET_LOCKS[closed_start]
+        bucket_lock = _BUCKET_LOCKS.setdefault(bucket_start, threading.Lock())
+
+    # Each append rewrites the whole part, so appends to one bucket are written
+    # in order; _PARTS_LOCK is only held while the part is updated in memory
+    with bucket_lock:
+        with _PARTS_LOCK:
+            part = _OPEN_PARTS.get(bucket_start)
+            previous = None
+            if part is None or part["event_count"] + len(events) > MAX_EVENTS_PER_PART:
+                previous = part
+                part_number = part["part"] + 1 if part else 0
+                part = {
+                    "part_key": f"{bucket_start}_{_WRITER_ID}_{part_number}",
+                    "bucket_start": bucket_start,
+                    "bucket_seconds": BUCKET_SECONDS,
+                    "writer_id": _WRITER_ID,
+                    "part": part_number,
+                    "event_count": 0,
+                    "first_timestamp": timestamp,
+                    "last_timestamp": timestamp,
+                    "events": []
+                }
+                _OPEN_PARTS[bucket_start] = part
+
+            part["events"].extend(events)
+            part["event_count"] += len(events)
+            part["last_timestamp"] = max(part["last_timestamp"], timestamp)
+            body = {**part, "events": list(part["events"])}
+
+        try:
+            response = api_client.command("PutObject",
+                                          body=body,
+                                          collection_name=BUCKET_COLLECTION,
+                                          object_key=part["part_key"],
+                                          headers=headers
+                                          )
+        except Exception:
+            _roll_back_append(part, previous, len(events))
+            raise
+
+        if response["status_code"] != 200:
+            _roll_back_append(part, previous, len(events))
+
+    return {"response": response, "part_key": part["part_key"]}
+
+
+def _roll_back_append(part: Dict[str, Any], previous: Dict[str, Any] | None, event_count: int) -> None:
+    """Remove the last event_count events from an open part after its write failed."""
+    # Keep the in-memory part in step with what was stored, so a later append
+    # does not store events that were reported as failed
+    with _PARTS_LOCK:
+        del part["events"][-event_count:]
+        part["event_count"] -= event_count
+        if part["event_count"] == 0 and _OPEN_PARTS.get(part["bucket_start"]) is part:
+            if previous is None:
+                del _OPEN_PARTS[part["bucket_start"]]
+            else:
+                _OPEN_PARTS[part["bucket_start"]] = previous
+
+
+def read_events_range(
+    api_client: APIHarnessV2,
+    layout: str,
+    start_time: int,
+    end_time: int,
+    headers: Dict[str, str],
+    page_size: int = 100
+) -> Dict[str, Any]:
+    """
+    Read all events with start_time <= timestamp < end_time.
+
+    The per-event layout searches the timestamp index and fetches every event.
+    The bucketed layout searches bucket_start and fetches only the overlapping parts.
+
+    Returns:
+        Dict with the events sorted by timestamp and the number of objects fetched.
+    """
+    if layout == "bucketed":
+        collection_name = BUCKET_COLLECTION
+        first_bucket = start_time - start_time % BUCKET_SECONDS
+        range_filter = f"bucket_start:>={first_bucket}+bucket_start:<{end_time}"
+    else:
+        collection_name = EVENT_COLLECTION
+        range_filter = f"timestamp:>={start_time}+timestamp:<{end_time}"
+
+    events = []
+    objects_read = 0
+    offset = 0
+
+    while True:
+        search_response = api_client.command("SearchObjects",
+                                             filter=range_filter,
+                                             collection_name=collection_name,
+                                             limit=page_size,
+                                             offset=offset,
+                                             headers=headers
+                                             )
+        if search_response["status_code"] != 200:
+            raise ConnectionError(f"SearchObjects failed with status {search_response['status_code']}: "
+                                  f"{search_response.get('body', {}).get('errors', [])}")
+        resources = search_response.get("body", {}).get("resources", [])
+
+        # SearchObjects returns metadata, not actual objects, so use GetObject for details
+        for resource in resources:
+            object_details = api_client.command("GetObject",
+                                                collection_name=collection_name,
+                                                object_key=resource["object_key"],
+                                                headers=headers
+                                                )
+            if not isinstance(object_details, bytes):
+                raise ConnectionError(f"GetObject failed for {resource['object_key']}: "
+                                      f"{object_details.get('status_code')}")
+            stored = json.loads(object_details.decode("utf-8"))
+            objects_read += 1
+
+            for event in stored["events"] if layout == "bucketed" else [stored]:
+                if start_time <= event["timestamp"] < end_time:
+                    events.append(event)
+
+        if len(resources) < page_size:
+            break
+        offset += page_size
+
+    events.sort(key=lambda event: event["timestamp"])
+    return {"events": events, "objects_read": objects_read}
+
+
 if __name__ == "__main__":
     FUNC.run()
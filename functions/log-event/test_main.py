@@ -0,0 +1,162 @@
+"""Tests for the log-event function."""
+
+import importlib
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from crowdstrike.foundry.function import Request
+
+import main
+
+
+def mock_handler(*_args, **_kwargs):
+    """Replace FUNC.handler so decorated handlers stay callable."""
+    def identity(func):
+        return func
+    return identity
+
+
+class FnTestCase(unittest.TestCase):
+    """Base test case that reloads main with a pass-through handler decorator."""
+
+    def setUp(self):
+        patcher = patch("crowdstrike.foundry.function.Function.handler", new=mock_handler)
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        importlib.reload(main)
+        self.api_client = MagicMock()
+        self.api_client.command.return_value = {"status_code": 200, "body": {"resources": []}}
+        api_patcher = patch.object(main, "APIHarnessV2", return_value=self.api_client)
+        self.addCleanup(api_patcher.stop)
+        api_patcher.start()
+
+
+class LogEventTestCase(FnTestCase):
+    """Tests for the /log-event handler."""
+
+    def test_event_list_requires_bucketed_layout(self):
+        """A list cannot be stored as a single event_logs object."""
+        for body in [{"event_data": [{"a": 1}]}, {"event_data": [{"a": 1}], "layout": "event"}]:
+            with self.subTest(body=body):
+                self.assertEqual(main.on_post(Request(body=body)).code, 400)
+        self.api_client.command.assert_not_called()
+
+    def test_empty_event_list_is_rejected(self):
+        """An empty batch returns 400 instead of failing to find a timestamp."""
+        response = main.on_post(Request(body={"event_data": [], "layout": "bucketed"}))
+
+        self.assertEqual(response.code, 400)
+        self.api_client.command.assert_not_called()
+
+    def test_bucketed_event_list_is_appended(self):
+        """A batch of events is written to one bucket part."""
+        response = main.on_post(Request(body={"event_data": [{"a": 1}, {"a": 2}], "layout": "bucketed"}))
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(len(response.body["event_ids"]), 2)
+        self.assertEqual(self.api_client.command.call_args.kwargs["collection_name"], main.BUCKET_COLLECTION)
+
+    def test_single_event_is_stored(self):
+        """An object is stored under its own key by default."""
+        response = main.on_post(Request(body={"event_data": {"a": 1}}))
+
+        self.assertEqual(response.code, 200)
+        self.assertTrue(response.body["stored"])
+
+
+class BucketAppendTestCase(FnTestCase):
+    """Tests for appending events to bucket parts."""
+
+    def append(self, events):
+        """Append events to their bucket part."""
+        return main.append_to_bucket(self.api_client, events, {})
+
+    def stored_timestamps(self):
+        """Timestamps in the body of the last PutObject call."""
+        return [event["timestamp"] for event in self.api_client.command.call_args.kwargs["body"]["events"]]
+
+    def test_failed_write_is_not_stored_by_a_later_append(self):
+        """Events from a write that raised or was rejected are rolled back."""
+        self.append([{"timestamp": 60}])
+        for failure in [ConnectionError("connection reset"), {"status_code": 500, "body": {"errors": ["boom"]}}]:
+            with self.subTest(failure=failure):
+                if isinstance(failure, Exception):
+                    self.api_client.command.side_effect = failure
+                    with self.assertRaises(ConnectionError):
+                        self.append([{"timestamp": 61}])
+                else:
+                    self.api_client.command.side_effect = None
+                    self.api_client.command.return_value = failure
+                    self.assertEqual(self.append([{"timestamp": 61}])["response"]["status_code"], 500)
+
+        self.api_client.command.side_effect = None
+        self.api_client.command.return_value = {"status_code": 200, "body": {}}
+        self.append([{"timestamp": 62}])
+
+        self.assertEqual(self.stored_timestamps(), [60, 62])
+
+    def test_write_does_not_hold_the_parts_lock(self):
+        """Appends to other buckets are not blocked while a part is written."""
+        def put_object(*_args, **_kwargs):
+            self.assertFalse(main._PARTS_LOCK.locked())  # pylint: disable=protected-access
+            return {"status_code": 200, "body": {}}
+        self.api_client.command.side_effect = put_object
+
+        self.append([{"timestamp": 60}])
+        self.append([{"timestamp": 61}])
+
+        self.assertEqual(self.stored_timestamps(), [60, 61])
+
+
+class ReadEventsTestCase(FnTestCase):
+    """Tests for the /read-events handler."""
+
+    def use_storage(self, search_response, objects):
+        """Answer SearchObjects with search_response and GetObject from objects."""
+        self.api_client.command.side_effect = lambda operation, **kwargs: (
+            search_response if operation == "SearchObjects"
+            else objects.get(kwargs["object_key"], {"status_code": 404, "body": {"errors": ["not found"]}}))
+
+    def read(self, body):
+        """Call the handler and return the response."""
+        return main.read_events_handler(Request(body=body))
+
+    def test_bucketed_read_returns_sorted_events_in_range(self):
+        """Events outside [start_time, end_time) in overlapping parts are dropped."""
+        parts = {
+            "part-1": {"events": [{"timestamp": 3590}, {"timestamp": 3650}, {"timestamp": 3620}]},
+            "part-2": {"events": [{"timestamp": 3700}, {"timestamp": 3605}]}
+        }
+        self.use_storage({"status_code": 200, "body": {"resources": [{"object_key": key} for key in parts]}},
+                         {key: json.dumps(part).encode("utf-8") for key, part in parts.items()})
+
+        response = self.read({"start_time": 3600, "end_time": 3700, "layout": "bucketed"})
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual([event["timestamp"] for event in response.body["events"]], [3605, 3620, 3650])
+        self.assertEqual(response.body["objects_read"], 2)
+        self.assertEqual(self.api_client.command.call_args_list[0].kwargs["filter"],
+                         "bucket_start:>=3600+bucket_start:<3700")
+
+    def test_failed_search_is_reported(self):
+        """A failed SearchObjects call returns 500 instead of an empty result."""
+        self.use_storage({"status_code": 403, "body": {"errors": ["access denied"]}}, {})
+
+        response = self.read({"start_time": 0, "end_time": 60})
+
+        self.assertEqual(response.code, 500)
+        self.assertIn("SearchObjects failed with status 403", response.errors[0].message)
+
+    def test_failed_get_object_is_reported(self):
+        """A GetObject error response returns 500 instead of failing to decode it."""
+        self.use_storage({"status_code": 200, "body": {"resources": [{"object_key": "missing"}]}}, {})
+
+        response = self.read({"start_time": 0, "end_time": 60})
+
+        self.assertEqual(response.code, 500)
+        self.assertIn("GetObject failed for missing", response.errors[0].message)
+
+
+if __name__ == "__main__":
+    unittest.main()